@@ -5,17 +5,115 @@ models including ChatSession, Message, and Document. It provides customized
 list displays, filters, search capabilities, and read-only fields.
 
 Classes:
+    EstimatedCountPaginator: Paginator using PostgreSQL row estimates.
+    ListColumnsChangeList: ChangeList that loads only the listed columns.
+    ListColumnsAdminMixin: Wires ``list_only_fields`` into the changelist.
     ChatSessionAdmin: Admin configuration for ChatSession model.
     MessageAdmin: Admin configuration for Message model.
     DocumentAdmin: Admin configuration for Document model.
 """
 
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models.functions import Length, Substr
+from django.utils.functional import cached_property
 from .models import ChatSession, Message, Document
 
 
+class EstimatedCountPaginator(Paginator):
+    """Paginator that avoids ``COUNT(*)`` on large unfiltered tables.
+
+    For unfiltered querysets on PostgreSQL, the row count is read from
+    the planner statistics in ``pg_class.reltuples`` instead of scanning
+    the table. Filtered querysets, other database backends, and tables
+    that have never been analyzed fall back to an exact count.
+    """
+
+    @cached_property
+    def count(self):
+        """Return the (possibly estimated) total number of objects.
+
+        Returns:
+            int: The estimated row count for unfiltered PostgreSQL
+                querysets, otherwise the exact count.
+        """
+        query = getattr(self.object_list, "query", None)
+        if query is None or query.where:
+            return super().count
+
+        connection = connections[self.object_list.db]
+        if connection.vendor != "postgresql":
+            return super().count
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                [query.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+
+        # reltuples is -1 (or missing) until the table has been analyzed
+        if not row or row[0] < 0:
+            return super().count
+        return row[0]
+
+
+class ListColumnsChangeList(ChangeList):
+    """ChangeList that restricts row loading to ``list_only_fields``.
+
+    The restriction is applied here rather than in
+    ``ModelAdmin.get_queryset`` so the change form and other views still
+    load complete objects instead of fetching deferred fields one query
+    at a time.
+    """
+
+    def get_queryset(self, request, exclude_parameters=None):
+        """Return the changelist queryset limited to the listed columns.
+
+        Args:
+            request: The HttpRequest object.
+            exclude_parameters: Filter parameters to ignore, passed
+                through to ChangeList.get_queryset.
+
+        Returns:
+            QuerySet: The filtered and ordered changelist queryset.
+        """
+        queryset = super().get_queryset(request, exclude_parameters)
+        only_fields = getattr(self.model_admin, "list_only_fields", None)
+        if only_fields:
+            queryset = queryset.only(*only_fields)
+        return queryset
+
+
+class ListColumnsAdminMixin:
+    """ModelAdmin mixin that loads only ``list_only_fields`` for list rows.
+
+    Attributes:
+        list_only_fields (tuple): Columns, including those on
+            ``list_select_related`` relations, needed to render a
+            changelist row. Everything else (large text bodies, file
+            paths) is left out of the SELECT.
+    """
+
+    list_only_fields = ()
+
+    def get_changelist(self, request, **kwargs):
+        """Return the ChangeList class used for the list view.
+
+        Args:
+            request: The HttpRequest object.
+            **kwargs: Unused, accepted for API compatibility.
+
+        Returns:
+            type: The ListColumnsChangeList class.
+        """
+        return ListColumnsChangeList
+
+
 @admin.register(ChatSession)
-class ChatSessionAdmin(admin.ModelAdmin):
+class ChatSessionAdmin(ListColumnsAdminMixin, admin.ModelAdmin):
     """Admin configuration for the ChatSession model.
 
     Provides a customized admin interface for managing chat sessions
@@ -28,6 +126,9 @@ class ChatSessionAdmin(admin.ModelAdmin):
         date_hierarchy (str): Field for date-based navigation.
         ordering (tuple): Default ordering for the list view.
         readonly_fields (tuple): Fields that cannot be edited.
+        list_select_related (tuple): Related objects joined into the
+            changelist query to avoid per-row lookups.
+        list_only_fields (tuple): Columns loaded for changelist rows.
     """
 
     list_display = ("id", "user", "title", "created_at", "updated_at")
@@ -36,49 +137,97 @@ class ChatSessionAdmin(admin.ModelAdmin):
     date_hierarchy = "created_at"
     ordering = ("-updated_at",)
     readonly_fields = ("created_at", "updated_at")
+    list_select_related = ("user",)
+    list_only_fields = ("id", "title", "created_at", "updated_at", "user__username")
 
 
 @admin.register(Message)
-class MessageAdmin(admin.ModelAdmin):
+class MessageAdmin(ListColumnsAdminMixin, admin.ModelAdmin):
     """Admin configuration for the Message model.
 
     Provides a customized admin interface for managing chat messages
     with a content preview, filtering by role and date, and search
     capabilities.
 
+    Messages are the largest table, so there is no date_hierarchy: its
+    drilldown runs MIN/MAX and DISTINCT date aggregates over the whole
+    table on every page load. The ``created_at`` list filter offers the
+    same coarse date buckets as indexed range lookups instead.
+
     Attributes:
         list_display (tuple): Fields to display in the list view.
         list_filter (tuple): Fields to filter by in the sidebar.
         search_fields (tuple): Fields to search in.
-        date_hierarchy (str): Field for date-based navigation.
         ordering (tuple): Default ordering for the list view.
         readonly_fields (tuple): Fields that cannot be edited.
+        list_select_related (tuple): Related objects joined into the
+            changelist query to avoid per-row lookups.
+        list_only_fields (tuple): Columns loaded for changelist rows.
+        paginator (type): Paginator using estimated counts for large tables.
+        show_full_result_count (bool): Disabled to skip the extra count query.
     """
 
     list_display = ("id", "session", "role", "content_preview", "created_at")
     list_filter = ("role", "created_at", "session__user")
     search_fields = ("content", "session__title")
-    date_hierarchy = "created_at"
     ordering = ("-created_at",)
     readonly_fields = ("created_at",)
+    list_select_related = ("session", "session__user")
+    list_only_fields = (
+        "id",
+        "role",
+        "created_at",
+        "session__id",
+        "session__title",
+        "session__user__id",
+        "session__user__username",
+    )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        """Return the queryset with the content preview computed in SQL.
+
+        ``content`` is not in ``list_only_fields``, so changelist rows
+        carry only a 51-character substring and the content length
+        instead of full message bodies.
+
+        Args:
+            request: The HttpRequest object.
+
+        Returns:
+            QuerySet: Messages annotated with ``_content_preview`` and
+                ``_content_length``.
+        """
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                _content_preview=Substr("content", 1, 51),
+                _content_length=Length("content"),
+            )
+        )
 
     def content_preview(self, obj):
         """Generate a truncated preview of the message content.
 
         Args:
-            obj: The Message model instance.
+            obj: The Message model instance, annotated by get_queryset.
 
         Returns:
             str: The first 50 characters of the message content,
                 with ellipsis if truncated.
         """
-        return obj.content[:50] + "..." if len(obj.content) > 50 else obj.content
+        preview = obj._content_preview or ""
+        if obj._content_length and obj._content_length > 50:
+            return preview[:50] + "..."
+        return preview
 
     content_preview.short_description = "Content Preview"
 
 
 @admin.register(Document)
-class DocumentAdmin(admin.ModelAdmin):
+class DocumentAdmin(ListColumnsAdminMixin, admin.ModelAdmin):
     """Admin configuration for the Document model.
 
     Provides a customized admin interface for managing uploaded
@@ -91,6 +240,11 @@ class DocumentAdmin(admin.ModelAdmin):
         date_hierarchy (str): Field for date-based navigation.
         ordering (tuple): Default ordering for the list view.
         readonly_fields (tuple): Fields that cannot be edited.
+        list_select_related (tuple): Related objects joined into the
+            changelist query to avoid per-row lookups.
+        list_only_fields (tuple): Columns loaded for changelist rows.
+        paginator (type): Paginator using estimated counts for large tables.
+        show_full_result_count (bool): Disabled to skip the extra count query.
     """
 
     list_display = ("id", "session", "title", "uploaded_at")
@@ -99,3 +253,14 @@ class DocumentAdmin(admin.ModelAdmin):
     date_hierarchy = "uploaded_at"
     ordering = ("-uploaded_at",)
     readonly_fields = ("uploaded_at",)
+    list_select_related = ("session", "session__user")
+    list_only_fields = (
+        "id",
+        "title",
+        "uploaded_at",
+        "session__id",
+        "session__title",
+        "session__user__username",
+    )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
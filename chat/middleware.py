@@ -7,7 +7,10 @@ The middleware supports:
     - 10-20 users total
     - 5-10 parallel users simultaneously
     - Free-tier API constraints (Gemini, Pinecone)
-    - DatabaseCache stored in NeonDB for multi-worker support
+    - Shared "rate_limit" cache alias for multi-worker support (Redis when
+      REDIS_URL is set, otherwise DatabaseCache stored in NeonDB)
+    - Atomic check-and-count through a Lua script on Redis; the
+      DatabaseCache fallback uses read-modify-write of cached dicts
 
 Classes:
     RateLimitMiddleware: General rate limiting for all POST requests.
@@ -19,12 +22,26 @@ Constants:
     GLOBAL_PARALLEL_LIMIT: Maximum concurrent requests globally.
 """
 
+import json
 import logging
-from django.http import JsonResponse
-from django.core.cache import cache
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.core.cache import caches
+from django.utils.connection import ConnectionProxy
 
 logger = logging.getLogger(__name__)
 
+# All rate limit state lives in its own cache alias (see CACHES in settings)
+RATE_LIMIT_CACHE_ALIAS = "rate_limit"
+cache = ConnectionProxy(caches, RATE_LIMIT_CACHE_ALIAS)
+
 # Rate Limit Configuration
 # For 10-20 users with 5-10 parallel users on free tier:
 # - Allow 10 requests per minute per user (reasonable for conversation flow)
@@ -33,13 +50,372 @@ logger = logging.getLogger(__name__)
 
 USER_REQUESTS_PER_MINUTE = 10
 USER_REQUESTS_PER_HOUR = 100
+API_REQUESTS_PER_MINUTE = 5
 GLOBAL_PARALLEL_LIMIT = 50
 
-# Cache key prefixes
-CACHE_PREFIX_MINUTE = "rate_limit_minute_"
-CACHE_PREFIX_HOUR = "rate_limit_hour_"
+# Per-user limits as (name, window seconds, max requests per window)
+USER_LIMITS = (
+    ("minute", 60, USER_REQUESTS_PER_MINUTE),
+    ("hour", 3600, USER_REQUESTS_PER_HOUR),
+)
+API_LIMITS = (("api", 60, API_REQUESTS_PER_MINUTE),)
+
+# Cache keys. All of a user's counters share one entry, kept for two of the
+# longest windows so the previous window's count is still available.
+CACHE_PREFIX_USER = "rate_limit_user_sw_"
+CACHE_USER_TIMEOUT = 7200
 CACHE_PREFIX_GLOBAL = "rate_limit_global_active"
 
+# Lifetime of a global parallel slot. Matches the Gunicorn worker timeout so
+# a slot held by a killed worker is reclaimed once the request could no
+# longer be running.
+GLOBAL_SLOT_TTL = 120
+
+# How long (seconds) a worker trusts its last read of the global slot count.
+# The pre-check in _check_global_limit is served only from this per-process
+# snapshot, which _check_limits_and_acquire_slot refreshes on every read.
+GLOBAL_SNAPSHOT_TTL = 0.1
+_global_slots_snapshot = {"active": 0, "checked_at": float("-inf")}
+
+# Atomic check-and-count used when the rate limit alias is Redis. KEYS[1] is
+# the global slot sorted set (slot ID scored by expiry timestamp), followed
+# by a (current window, previous window) counter key pair per limit. ARGV is
+# the current time, the parallel limit (0 to skip reserving a slot), the
+# slot ID, its expiry and the slot set TTL, then (max_requests, overlap of
+# the previous window, key TTL) per limit. Returns {status, active} where
+# status is 0 if the request was counted (and the slot reserved), the
+# 1-based index of the exceeded limit, or -1 if the parallel limit is
+# reached, and active is the number of slots held before this request.
+REDIS_CONSUME_SCRIPT = """
+local parallel_limit = tonumber(ARGV[2])
+local limit_count = (#ARGV - 5) / 3
+
+local active = 0
+if parallel_limit > 0 then
+    redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", ARGV[1])
+    active = redis.call("ZCARD", KEYS[1])
+end
+
+for i = 1, limit_count do
+    local max_requests = tonumber(ARGV[3 + i * 3])
+    local overlap = tonumber(ARGV[4 + i * 3])
+    local count = tonumber(redis.call("GET", KEYS[i * 2]) or "0")
+    local previous = tonumber(redis.call("GET", KEYS[i * 2 + 1]) or "0")
+    if previous * overlap + count >= max_requests then
+        return {i, active}
+    end
+end
+
+if parallel_limit > 0 and active >= parallel_limit then
+    return {-1, active}
+end
+
+for i = 1, limit_count do
+    redis.call("INCR", KEYS[i * 2])
+    redis.call("EXPIRE", KEYS[i * 2], ARGV[5 + i * 3])
+end
+
+if parallel_limit > 0 then
+    redis.call("ZADD", KEYS[1], ARGV[4], ARGV[3])
+    redis.call("EXPIRE", KEYS[1], ARGV[5])
+end
+return {0, active}
+"""
+_redis_consume_script = None
+
+# Redis client for the script, built from settings.REDIS_URL on first use
+# (after Gunicorn forks, so workers don't share sockets). Thread-safe: it
+# draws connections from its own pool.
+_redis_client = None
+_redis_client_lock = threading.Lock()
+
+# Per-worker memory of recent per-user rejections, mapping
+# (user_id, limit) to the monotonic time its Retry-After elapses. Until then
+# further requests from that user are rejected without a cache round trip.
+# Bounded as an LRU; the lock guards the compound update-and-evict.
+REJECTION_MEMORY_SIZE = 10000
+_recent_rejections = OrderedDict()
+_recent_rejections_lock = threading.Lock()
+
+# Path prefixes that are never rate limited (static files, admin, auth).
+# Built once at import; str.startswith accepts a tuple and matches in C.
+EXEMPT_PATH_PREFIXES = (
+    "/static/",
+    "/media/",
+    f"/{os.getenv('ADMIN_URL_PATH', 'admin/')}",
+    "/accounts/login/",
+    "/accounts/logout/",
+    "/favicon.ico",
+)
+
+
+# Rejection details keyed by the limit that was exceeded:
+# (error code, user-facing message, Retry-After seconds)
+RATE_LIMIT_DETAILS = {
+    "global": (
+        "rate_limit_exceeded",
+        "System is currently at capacity. Please try again in a moment.",
+        5,
+    ),
+    "minute": (
+        "rate_limit_exceeded",
+        "Too many requests. Please wait a moment before sending another message.",
+        10,
+    ),
+    "hour": (
+        "rate_limit_exceeded",
+        "Hourly limit reached. Please try again later.",
+        300,  # 5 minutes
+    ),
+    "api": (
+        "api_rate_limit",
+        "AI API rate limit reached. Please wait before sending another message.",
+        30,
+    ),
+}
+
+# Pre-serialized 429 JSON bodies. Rejections are most frequent under abuse,
+# so the JSON is encoded once at import and each rejection only wraps the
+# cached bytes in a fresh response.
+RATE_LIMIT_JSON_BODIES = {
+    limit: json.dumps(
+        {"error": error, "message": message, "retry_after": retry_after}
+    ).encode()
+    for limit, (error, message, retry_after) in RATE_LIMIT_DETAILS.items()
+}
+
+# HTML fragments for HTMX requests, rendered on first use (templates are not
+# loaded at import time) and reused afterwards
+_htmx_rate_limit_fragments = {}
+
+
+def _refresh_global_snapshot(active):
+    """Record this worker's latest read of the global slot count.
+
+    Args:
+        active: The number of active global parallel slots.
+    """
+    _global_slots_snapshot["active"] = active
+    _global_slots_snapshot["checked_at"] = time.monotonic()
+
+
+def _count_user_limits(counters, limits):
+    """Apply a request to a user's counters without touching the cache.
+
+    Each limit is a sliding window counter: alongside the count for the
+    current fixed window it keeps the count from the window before, and
+    weights that by how much of the previous window still overlaps the
+    last ``window_seconds``. This avoids the burst of up to twice the
+    limit that plain fixed windows allow around a window boundary, while
+    storing only two counts per limit.
+
+    Args:
+        counters: The user's counter mapping of limit name to
+            ``(window_number, count, previous_count)``, where the window
+            number is the current time divided by the window length.
+        limits: Iterable of ``(name, window_seconds, max_requests)``
+            tuples, checked in order.
+
+    Returns:
+        tuple: ``(exceeded, updated)`` where ``exceeded`` is the name of
+            the first exceeded limit or None, and ``updated`` is the
+            counter mapping with this request counted.
+    """
+    now = time.time()
+    updated = dict(counters)
+
+    for name, window_seconds, max_requests in limits:
+        window, elapsed = divmod(now, window_seconds)
+        window = int(window)
+        counted_window, count, previous = counters.get(name, (window, 0, 0))
+        if counted_window == window - 1:
+            previous, count = count, 0
+        elif counted_window != window:
+            previous, count = 0, 0
+
+        overlap = 1 - elapsed / window_seconds
+        if previous * overlap + count >= max_requests:
+            return name, updated
+        updated[name] = (window, count + 1, previous)
+
+    return None, updated
+
+
+def _get_redis_client():
+    """Return the Redis client used for atomic rate limiting.
+
+    The client connects to the same REDIS_URL that backs the rate limit
+    cache alias, and is created once per process.
+
+    Returns:
+        redis.Redis or None: The shared client, or None when REDIS_URL is
+            not set and the alias falls back to DatabaseCache.
+    """
+    global _redis_client
+    redis_url = getattr(settings, "REDIS_URL", None)
+    if not redis_url:
+        return None
+    if _redis_client is None:
+        with _redis_client_lock:
+            if _redis_client is None:
+                # Imported here: redis is only needed when REDIS_URL is set
+                import redis
+
+                _redis_client = redis.Redis.from_url(redis_url)
+    return _redis_client
+
+
+def _redis_consume(client, user_id, limits, slot_id=None):
+    """Atomically check and count a request against limits in Redis.
+
+    Runs REDIS_CONSUME_SCRIPT in one round trip, so concurrent requests
+    from any worker cannot overwrite each other's counts or slots. The
+    limits are the same sliding window counters as _count_user_limits,
+    stored as one integer key per fixed window.
+
+    Args:
+        client: The raw Redis client from _get_redis_client.
+        user_id: The ID of the user making the request.
+        limits: Iterable of ``(name, window_seconds, max_requests)``
+            tuples, checked in order.
+        slot_id: Optional global parallel slot to reserve along with
+            counting the request.
+
+    Returns:
+        tuple: ``(exceeded, active)`` where ``exceeded`` is the name of
+            the first exceeded limit, ``"global"``, or None if the request
+            was counted, and ``active`` is the number of global slots held
+            before this request (0 if no slot was requested).
+    """
+    global _redis_consume_script
+    if _redis_consume_script is None:
+        _redis_consume_script = client.register_script(REDIS_CONSUME_SCRIPT)
+
+    limits = tuple(limits)
+    now = time.time()
+    keys = [cache.make_key(CACHE_PREFIX_GLOBAL)]
+    if slot_id is None:
+        args = [now, 0, "", 0, 0]
+    else:
+        expires = now + GLOBAL_SLOT_TTL
+        args = [now, GLOBAL_PARALLEL_LIMIT, slot_id, expires, GLOBAL_SLOT_TTL]
+
+    for name, window_seconds, max_requests in limits:
+        window, elapsed = divmod(now, window_seconds)
+        window = int(window)
+        prefix = f"{CACHE_PREFIX_USER}{user_id}_{name}_"
+        keys.append(cache.make_key(f"{prefix}{window}"))
+        keys.append(cache.make_key(f"{prefix}{window - 1}"))
+        args.extend((max_requests, 1 - elapsed / window_seconds, 2 * window_seconds))
+
+    status, active = _redis_consume_script(keys=keys, args=args, client=client)
+    if status == 0:
+        return None, active
+    if status < 0:
+        return "global", active
+    return limits[status - 1][0], active
+
+
+def _consume_user_limits(user_id, limits):
+    """Check and count a request against some of a user's rate limits.
+
+    On Redis the check and count are a single atomic script call (see
+    _redis_consume). The DatabaseCache fallback keeps every counter for
+    a user in one cache entry (see _count_user_limits), so checking any
+    set of limits costs one cache read and, if the request is allowed,
+    one write. That read-modify-write is not atomic, so concurrent
+    requests from the same user can undercount on the fallback.
+
+    Args:
+        user_id: The ID of the user making the request.
+        limits: Iterable of ``(name, window_seconds, max_requests)``
+            tuples, checked in order.
+
+    Returns:
+        str or None: The name of the first exceeded limit, or None if the
+            request is allowed and has been counted.
+    """
+    client = _get_redis_client()
+    if client is not None:
+        return _redis_consume(client, user_id, limits)[0]
+
+    cache_key = f"{CACHE_PREFIX_USER}{user_id}"
+    exceeded, counters = _count_user_limits(cache.get(cache_key) or {}, limits)
+    if exceeded is None:
+        cache.set(cache_key, counters, timeout=CACHE_USER_TIMEOUT)
+    return exceeded
+
+
+def _remember_rejection(user_id, limit):
+    """Record that a user was rejected for a limit in this worker.
+
+    Args:
+        user_id: The ID of the rejected user.
+        limit: The exceeded limit, one of the RATE_LIMIT_DETAILS keys.
+    """
+    key = (user_id, limit)
+    until = time.monotonic() + RATE_LIMIT_DETAILS[limit][2]
+    with _recent_rejections_lock:
+        _recent_rejections[key] = until
+        _recent_rejections.move_to_end(key)
+        while len(_recent_rejections) > REJECTION_MEMORY_SIZE:
+            _recent_rejections.popitem(last=False)
+
+
+def _remembered_rejection(user_id, limits):
+    """Return a limit this worker recently rejected the user for.
+
+    Args:
+        user_id: The ID of the user making the request.
+        limits: Limit names to look up, in order.
+
+    Returns:
+        str or None: The first limit whose remembered rejection has not
+            yet reached its Retry-After, or None.
+    """
+    now = time.monotonic()
+    for limit in limits:
+        until = _recent_rejections.get((user_id, limit))
+        if until is not None and until > now:
+            return limit
+    return None
+
+
+def _rate_limit_response(request, limit):
+    """Generate a rate limit response for the exceeded limit.
+
+    HTMX requests receive the system message partial so the error can be
+    shown inline in the chat; other requests receive the JSON body.
+
+    Args:
+        request: The HttpRequest object.
+        limit: The exceeded limit, one of the RATE_LIMIT_DETAILS keys
+            ("global", "minute", "hour" or "api").
+
+    Returns:
+        HttpResponse: A 429 response with the Retry-After header set.
+    """
+    _, message, retry_after = RATE_LIMIT_DETAILS[limit]
+
+    if "HX-Request" in request.headers:
+        fragment = _htmx_rate_limit_fragments.get(limit)
+        if fragment is None:
+            fragment = render_to_string(
+                "chat/partials/system_message.html",
+                {"content": message, "error": True},
+            )
+            _htmx_rate_limit_fragments[limit] = fragment
+        response = HttpResponse(fragment, status=429)
+    else:
+        response = HttpResponse(
+            RATE_LIMIT_JSON_BODIES[limit],
+            status=429,
+            content_type="application/json",
+        )
+
+    response["Retry-After"] = str(retry_after)
+    return response
+
 
 class RateLimitMiddleware:
     """Middleware to enforce rate limits on user requests.
@@ -84,45 +460,52 @@ class RateLimitMiddleware:
         if not self._should_rate_limit(request):
             return self.get_response(request)
 
+        # Anonymous sessions carry no auth key; skip them without resolving
+        # request.user, which would load the user from the database
+        session = getattr(request, "session", None)
+        if session is not None and SESSION_KEY not in session:
+            return self.get_response(request)
+
         # Check if user is authenticated
         if not request.user.is_authenticated:
             return self.get_response(request)
 
         user_id = request.user.id
 
+        # A user rejected moments ago is rejected again without a cache hit
+        remembered_limit = _remembered_rejection(user_id, ("minute", "hour"))
+        if remembered_limit is not None:
+            return _rate_limit_response(request, remembered_limit)
+
         # Check rate limits in order of severity
-        # 1. Check global parallel limit first (most critical)
+        # 1. Reject early if this worker recently saw the system at capacity
         if not self._check_global_limit():
             logger.warning("Global parallel limit exceeded")
-            return self._rate_limit_response(
-                "System is currently at capacity. Please try again in a moment.",
-                retry_after=5,
-            )
+            return _rate_limit_response(request, "global")
 
-        # 2. Check per-user minute limit
-        if not self._check_user_minute_limit(user_id):
+        # 2-3. Check per-user minute and hour limits and reserve a global
+        # slot (re-checks capacity) from a single cache read
+        exceeded_limit, slot_id = self._check_limits_and_acquire_slot(user_id)
+
+        if exceeded_limit == "minute":
             logger.warning("User %s exceeded minute rate limit", user_id)
-            return self._rate_limit_response(
-                "Too many requests. Please wait a moment before sending another message.",
-                retry_after=10,
-            )
+            _remember_rejection(user_id, "minute")
+            return _rate_limit_response(request, "minute")
 
-        # 3. Check per-user hour limit
-        if not self._check_user_hour_limit(user_id):
+        if exceeded_limit == "hour":
             logger.warning("User %s exceeded hourly rate limit", user_id)
-            return self._rate_limit_response(
-                "Hourly limit reached. Please try again later.",
-                retry_after=300,  # 5 minutes
-            )
+            _remember_rejection(user_id, "hour")
+            return _rate_limit_response(request, "hour")
 
-        # Increment global counter before processing
-        self._increment_global_counter()
+        if exceeded_limit == "global":
+            logger.warning("Global parallel limit exceeded")
+            return _rate_limit_response(request, "global")
 
         try:
             response = self.get_response(request)
         finally:
-            # Decrement global counter after processing
-            self._decrement_global_counter()
+            # Release the global slot after processing
+            self._release_global_slot(slot_id)
 
         return response
 
@@ -138,152 +521,148 @@ class RateLimitMiddleware:
         Returns:
             bool: True if the request should be rate limited, False otherwise.
         """
-        import os
-
-        path = request.path
-        admin_path = f"/{os.getenv('ADMIN_URL_PATH', 'admin/')}"
-
-        # Don't rate limit these paths
-        exempt_paths = [
-            "/static/",
-            "/media/",
-            admin_path,
-            "/accounts/login/",
-            "/accounts/logout/",
-            "/favicon.ico",
-        ]
-
-        for exempt_path in exempt_paths:
-            if path.startswith(exempt_path):
-                return False
-
         # Only rate limit POST requests (actual actions)
         # Allow GET requests for loading pages/chat history
         if request.method != "POST":
             return False
 
+        # Don't rate limit exempt paths
+        if request.path.startswith(EXEMPT_PATH_PREFIXES):
+            return False
+
         return True
 
-    def _check_global_limit(self):
-        """Check if global parallel request limit is exceeded.
+    def _prune_slots(self, slots):
+        """Drop expired slots and refresh this worker's snapshot.
+
+        Args:
+            slots: Mapping of slot IDs to expiry timestamps as read from
+                the cache, or None if the entry does not exist.
 
         Returns:
-            bool: True if under the limit, False if exceeded.
-                Returns True if cache is unavailable to fail open.
+            dict: Mapping of active slot IDs to their expiry timestamps.
         """
-        try:
-            active_requests = cache.get(CACHE_PREFIX_GLOBAL, 0)
-            return active_requests < GLOBAL_PARALLEL_LIMIT
-        except Exception as e:
-            # If cache is unavailable (e.g., table doesn't exist), allow request
-            logger.warning("Cache unavailable in _check_global_limit: %s", e)
-            return True
-
-    def _increment_global_counter(self):
-        """Increment the global active request counter.
+        now = time.time()
+        active = {
+            slot: expires for slot, expires in (slots or {}).items() if expires > now
+        }
+        _refresh_global_snapshot(len(active))
+        return active
 
-        Increments the counter with a 60-second timeout. Logs errors
-        but does not raise exceptions to avoid blocking requests.
-        """
-        try:
-            cache_key = CACHE_PREFIX_GLOBAL
-            current = cache.get(cache_key, 0)
-            cache.set(cache_key, current + 1, timeout=60)
-        except Exception as e:
-            logger.error("Failed to increment global counter: %s", e)
+    def _get_active_slots(self):
+        """Return the unexpired slots of the global parallel semaphore.
 
-    def _decrement_global_counter(self):
-        """Decrement the global active request counter.
+        The semaphore is a single cache entry mapping slot IDs to expiry
+        timestamps. Expired slots are dropped here, so a worker that dies
+        mid-request leaks its slot for at most GLOBAL_SLOT_TTL seconds.
 
-        Decrements the counter ensuring it doesn't go below zero.
-        Logs errors but does not raise exceptions.
+        Returns:
+            dict: Mapping of active slot IDs to their expiry timestamps.
         """
-        try:
-            cache_key = CACHE_PREFIX_GLOBAL
-            current = cache.get(cache_key, 0)
-            if current > 0:
-                cache.set(cache_key, current - 1, timeout=60)
-        except Exception as e:
-            logger.error("Failed to decrement global counter: %s", e)
+        return self._prune_slots(cache.get(CACHE_PREFIX_GLOBAL))
 
-    def _check_user_minute_limit(self, user_id):
-        """Check and update per-user minute rate limit.
+    def _check_global_limit(self):
+        """Check this worker's snapshot of the global parallel limit.
 
-        Args:
-            user_id: The ID of the user making the request.
+        Never reads the cache. A snapshot younger than GLOBAL_SNAPSHOT_TTL
+        that shows the limit reached rejects the request early; otherwise
+        the request goes on to _check_limits_and_acquire_slot, which reads
+        the slots, enforces the limit and refreshes the snapshot.
 
         Returns:
-            bool: True if the request is allowed, False if limit exceeded.
-                Returns True on cache errors to fail open.
+            bool: False if a fresh snapshot shows the limit reached,
+                True otherwise.
         """
-        cache_key = f"{CACHE_PREFIX_MINUTE}{user_id}"
-
-        try:
-            current_count = cache.get(cache_key, 0)
-            if current_count >= USER_REQUESTS_PER_MINUTE:
-                return False
-            cache.set(cache_key, current_count + 1, timeout=60)
+        age = time.monotonic() - _global_slots_snapshot["checked_at"]
+        if age >= GLOBAL_SNAPSHOT_TTL:
             return True
-        except Exception as e:
-            logger.error("Cache error in minute limit: %s", e)
-            return True  # Fail open to not block users
+        return _global_slots_snapshot["active"] < GLOBAL_PARALLEL_LIMIT
+
+    def _check_limits_and_acquire_slot(self, user_id):
+        """Check the per-user limits and reserve a global parallel slot.
 
-    def _check_user_hour_limit(self, user_id):
-        """Check and update per-user hourly rate limit.
+        On Redis the counters and the slot sorted set are checked and
+        updated atomically by one script call (see _redis_consume), so
+        the limits hold across workers under concurrent requests.
+
+        The DatabaseCache fallback reads the user's counters and the
+        global semaphore together with one ``get_many`` call and, if the
+        request is allowed, stores both with one ``set_many`` call. That
+        read-modify-write is not atomic: concurrent requests can overwrite
+        each other's slots, so the fallback may briefly exceed the limits.
+
+        Logs errors but does not raise exceptions to avoid blocking
+        requests.
 
         Args:
             user_id: The ID of the user making the request.
 
         Returns:
-            bool: True if the request is allowed, False if limit exceeded.
-                Returns True on cache errors to fail open.
+            tuple: ``(exceeded_limit, slot_id)``. ``exceeded_limit`` is
+                ``"minute"``, ``"hour"`` or ``"global"``, or None if the
+                request is allowed. ``slot_id`` is the slot to release
+                after processing, or None if the request was rejected.
+                Cache errors fail open with ``(None, slot_id)``.
         """
-        cache_key = f"{CACHE_PREFIX_HOUR}{user_id}"
-
+        user_key = f"{CACHE_PREFIX_USER}{user_id}"
+        slot_id = uuid.uuid4().hex
         try:
-            current_count = cache.get(cache_key, 0)
-            if current_count >= USER_REQUESTS_PER_HOUR:
-                return False
-            cache.set(cache_key, current_count + 1, timeout=3600)
-            return True
-        except Exception as e:
-            logger.error("Cache error in hour limit: %s", e)
-            return True  # Fail open to not block users
+            client = _get_redis_client()
+            if client is not None:
+                exceeded, active = _redis_consume(
+                    client, user_id, USER_LIMITS, slot_id
+                )
+                _refresh_global_snapshot(active)
+                return exceeded, slot_id if exceeded is None else None
 
-    def _rate_limit_response(self, message, retry_after=60):
-        """Generate a rate limit response.
+            entries = cache.get_many([user_key, CACHE_PREFIX_GLOBAL])
 
-        Creates a JSON response with rate limit error details and
-        sets the Retry-After header.
+            exceeded, counters = _count_user_limits(
+                entries.get(user_key) or {}, USER_LIMITS
+            )
+            if exceeded is not None:
+                return exceeded, None
+
+            slots = self._prune_slots(entries.get(CACHE_PREFIX_GLOBAL))
+            if len(slots) >= GLOBAL_PARALLEL_LIMIT:
+                return "global", None
+            slots[slot_id] = time.time() + GLOBAL_SLOT_TTL
+
+            # Both entries share the longer timeout; expired slots are pruned
+            # on read, so keeping the slot map around longer is harmless
+            failed = cache.set_many(
+                {user_key: counters, CACHE_PREFIX_GLOBAL: slots},
+                timeout=CACHE_USER_TIMEOUT,
+            )
+            if failed:
+                logger.error("Failed to store rate limit entries: %s", failed)
+        except Exception as e:
+            logger.error("Cache error in rate limits: %s", e)
+        return None, slot_id
 
-        Args:
-            message: The user-friendly error message to display.
-            retry_after: Seconds until the client should retry.
-                Defaults to 60.
+    def _release_global_slot(self, slot_id):
+        """Release a slot previously reserved by _check_limits_and_acquire_slot.
 
-        Returns:
-            JsonResponse: A 429 status response with error details.
-        """
-        # Check if this is an HTMX request
-        _ = (
-            "HX-Request" in self.get_response.__self__.META
-            if hasattr(self.get_response, "__self__")
-            else False
-        )
+        On Redis the slot is removed from the sorted set atomically; the
+        DatabaseCache fallback rewrites the slot map.
 
-        # For HTMX requests, return HTML partial
-        # For API requests, return JSON
-        response = JsonResponse(
-            {
-                "error": "rate_limit_exceeded",
-                "message": message,
-                "retry_after": retry_after,
-            },
-            status=429,
-        )
+        Logs errors but does not raise exceptions. Slots that cannot be
+        released expire on their own after GLOBAL_SLOT_TTL seconds.
 
-        response["Retry-After"] = str(retry_after)
-        return response
+        Args:
+            slot_id: The slot ID returned by _check_limits_and_acquire_slot.
+        """
+        try:
+            client = _get_redis_client()
+            if client is not None:
+                client.zrem(cache.make_key(CACHE_PREFIX_GLOBAL), slot_id)
+                return
+
+            slots = self._get_active_slots()
+            if slots.pop(slot_id, None) is not None:
+                cache.set(CACHE_PREFIX_GLOBAL, slots, timeout=GLOBAL_SLOT_TTL)
+        except Exception as e:
+            logger.error("Failed to release global request slot: %s", e)
 
 
 class APIRateLimitMiddleware:
@@ -308,8 +687,8 @@ class APIRateLimitMiddleware:
     def __call__(self, request):
         """Process an incoming request with API-specific rate limiting.
 
-        Only applies to POST requests on chat endpoints that contain
-        a message parameter.
+        Only applies to authenticated POST requests on chat endpoints
+        that contain a message parameter.
 
         Args:
             request: The HttpRequest object.
@@ -318,22 +697,23 @@ class APIRateLimitMiddleware:
             HttpResponse: Either the normal response or a 429 rate limit
                 response if the AI API limit is exceeded.
         """
-        # Only apply to chat message endpoints
-        if (
-            request.method == "POST"
-            and "/chat/" in request.path
-            and request.POST.get("message")
-        ):
-            if not self._check_api_rate_limit(request.user.id):
-                logger.warning("User %s exceeded API rate limit", request.user.id)
-                return JsonResponse(
-                    {
-                        "error": "api_rate_limit",
-                        "message": "AI API rate limit reached. Please wait before sending another message.",
-                        "retry_after": 30,
-                    },
-                    status=429,
-                )
+        # Only apply to chat message endpoints. The cheap method, path and
+        # user checks run first so request.POST (which parses the body) is
+        # only accessed for authenticated chat POSTs.
+        if request.method != "POST" or not request.path.startswith("/chat/"):
+            return self.get_response(request)
+
+        if not request.user.is_authenticated or not request.POST.get("message"):
+            return self.get_response(request)
+
+        user_id = request.user.id
+        if _remembered_rejection(user_id, ("api",)) is not None:
+            return _rate_limit_response(request, "api")
+
+        if not self._check_api_rate_limit(user_id):
+            logger.warning("User %s exceeded API rate limit", user_id)
+            _remember_rejection(user_id, "api")
+            return _rate_limit_response(request, "api")
 
         return self.get_response(request)
 
@@ -341,7 +721,8 @@ class APIRateLimitMiddleware:
         """Check API-specific rate limit for a user.
 
         More restrictive than general rate limiting, allowing only
-        5 AI calls per minute per user.
+        API_REQUESTS_PER_MINUTE AI calls per minute per user. The counter
+        shares the user's rate limit cache entry.
 
         Args:
             user_id: The ID of the user making the request.
@@ -350,14 +731,8 @@ class APIRateLimitMiddleware:
             bool: True if the request is allowed, False if limit exceeded.
                 Returns True on cache errors to fail open.
         """
-        cache_key = f"api_rate_limit_{user_id}"
-
         try:
-            current_count = cache.get(cache_key, 0)
-            if current_count >= 5:  # 5 AI calls per minute
-                return False
-            cache.set(cache_key, current_count + 1, timeout=60)
-            return True
+            return _consume_user_limits(user_id, API_LIMITS) is None
         except Exception as e:
             logger.error("Cache error in API limit: %s", e)
             return True  # Fail open to not block users
@@ -0,0 +1,47 @@
+"""Add pg_trgm GIN indexes backing the admin search fields.
+
+Django's admin search uses ``icontains``, which PostgreSQL renders as
+``UPPER(column::text) LIKE UPPER(%q%)``. A trigram index on the same
+``UPPER(...)`` expression lets those wildcard lookups use an index scan
+instead of a sequential scan. The indexes are PostgreSQL-only; on other
+backends (SQLite during development and tests) this migration is a no-op.
+"""
+
+from django.db import migrations
+
+TRIGRAM_INDEXES = [
+    ("chat_message_content_trgm", "chat_message", "content"),
+    ("chat_chatsession_title_trgm", "chat_chatsession", "title"),
+    ("chat_document_title_trgm", "chat_document", "title"),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """Create the pg_trgm extension and trigram indexes on PostgreSQL."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for index_name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} "
+            f"USING gin ((UPPER({column}::text)) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    """Drop the trigram indexes on PostgreSQL (extension is left in place)."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for index_name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0003_message_model_used"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
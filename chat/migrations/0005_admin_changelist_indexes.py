@@ -0,0 +1,31 @@
+# Generated by Django 5.2.11 on 2026-10-16 03:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0004_trigram_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="document",
+            index=models.Index(
+                fields=["-uploaded_at"], name="chat_docume_uploade_721c46_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["-created_at"], name="chat_messag_created_f18bb8_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["role", "-created_at"], name="chat_messag_role_a821ce_idx"
+            ),
+        ),
+    ]
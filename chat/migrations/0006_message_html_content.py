@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-16 04:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0005_admin_changelist_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="message",
+            name="html_content",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+    ]
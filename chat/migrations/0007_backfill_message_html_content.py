@@ -0,0 +1,42 @@
+"""Store rendered HTML for assistant messages saved before html_content.
+
+Message.get_html_content only reads the stored HTML, so existing assistant
+messages are rendered here once instead of on every history page view.
+"""
+
+from django.db import migrations
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def backfill_html_content(apps, schema_editor):
+    """Render and store HTML for assistant messages that have none."""
+    from chat.models import _render_markdown
+
+    Message = apps.get_model("chat", "Message")
+    pending = (
+        Message.objects.filter(role="assistant", html_content="")
+        .exclude(content="")
+        .only("id", "content")
+    )
+
+    batch = []
+    for message in pending.iterator(chunk_size=BACKFILL_BATCH_SIZE):
+        message.html_content = _render_markdown(message.content)
+        batch.append(message)
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            Message.objects.bulk_update(batch, ["html_content"])
+            batch = []
+    if batch:
+        Message.objects.bulk_update(batch, ["html_content"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0006_message_html_content"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_html_content, migrations.RunPython.noop),
+    ]
@@ -7,6 +7,7 @@ models from most powerful to lightest.
 The fallback system supports:
     - 12 AI models from Gemini 3 Flash to Gemma 3 1B
     - Automatic retry with exponential backoff
+    - Adaptive choice of the first model from recent success rates
     - Global exhaustion tracking with automatic reset
     - Graceful error handling and logging
 
@@ -14,24 +15,57 @@ Classes:
     ModelExhaustionError: Exception raised when all models are exhausted.
 
 Functions:
+    reset_client: Discard the shared Gemini client.
     reset_exhaustion_if_needed: Reset exhaustion flag after timeout.
+    get_model_cooldowns: Return the circuit breaker state of each model.
+    set_model_cooldown: Skip a failing model for a while.
+    clear_model_cooldown: Reset a model's breaker after a success.
+    get_model_stats: Return each model's recent success and failure counts.
+    get_model_state: Return cooldowns and statistics in one cache read.
+    record_model_outcome: Add a call's outcome to a model's statistics.
+    pick_start_index: Choose the model to try first.
     is_rate_limit_error: Check if an error indicates rate limiting.
+    is_quota_error: Check if an error indicates an exhausted quota.
+    get_retry_delay: Read the retry delay suggested by the API.
     is_fallback_error: Check if an error should trigger model fallback.
     generate_with_fallback: Generate AI response with automatic fallback.
     get_model_display_name: Convert model ID to user-friendly name.
     check_service_availability: Check if AI service is available.
 
 Constants:
-    MODEL_HIERARCHY: Ordered list of models from most to least powerful.
+    MODEL_HIERARCHY: Ordered tuple of models from most to least powerful.
+    MODEL_DISPLAY_NAMES: User-facing names keyed by model ID.
+    RATE_LIMIT_ERROR_PATTERN: Matches rate limit and overload errors.
+    QUOTA_ERROR_PATTERN: Matches quota and request rate errors.
+    FALLBACK_ERROR_PATTERN: Matches every error that triggers fallback.
     EXHAUSTION_RESET_TIME: Seconds before resetting exhaustion status.
+    EXHAUSTION_CHECK_INTERVAL: Seconds a worker trusts its last cache read.
+    MODEL_COOLDOWN_TIME: Seconds a model is skipped for after a failure.
+    MAX_MODEL_COOLDOWN_TIME: Upper bound on any model cooldown.
+    ROUTING_STATS_DECAY: Weight older outcomes keep when one is recorded.
+    ROUTING_PRIOR_SUCCESSES: Successes assumed for a model with no history.
+    ROUTING_MIN_SUCCESS_RATE: Sampled success rate a first model needs.
+    ROUTING_EXPLORE_RATE: Fraction of requests that start at the top.
+    RESPONSE_CACHE_TIMEOUT: Seconds a generated response is reused for.
     MAX_RETRIES_PER_MODEL: Number of retries per model.
     INITIAL_RETRY_DELAY: Base delay for exponential backoff.
+    MAX_RETRY_DELAY: Longest wait before retrying the same model.
+    RETRY_JITTER: Maximum random fraction added to each retry delay.
+    MODEL_TIMEOUT: Seconds to wait for a single model call.
+    GENERATION_DEADLINE: Seconds to spend on one generation across models.
 """
 
+import hashlib
 import os
 import logging
+import random
+import re
+import threading
 import time
+from concurrent.futures import Future
+import httpx
 from google import genai
+from google.genai import types
 from django.core.cache import cache
 from dotenv import load_dotenv
 
@@ -40,7 +74,7 @@ logger = logging.getLogger(__name__)
 
 # Model hierarchy from most powerful to lightest
 # Use actual available models from Google Gen AI API
-MODEL_HIERARCHY = [
+MODEL_HIERARCHY = (
     "gemini-3-flash-preview",
     "gemini-flash-latest",
     "gemini-2.5-flash",
@@ -53,15 +87,122 @@ MODEL_HIERARCHY = [
     "gemma-3-4b",
     "gemma-3-2b",
     "gemma-3-1b",
-]
-
-# Cache keys for rate limit exhaustion (shared across all workers)
+)
+
+# User-facing model names for the chat UI
+MODEL_DISPLAY_NAMES = {
+    "gemini-3-flash-preview": "Gemini 3 Flash",
+    "gemini-flash-latest": "Gemini Flash Latest",
+    "gemini-2.5-flash": "Gemini 2.5 Flash",
+    "gemini-2.0-flash": "Gemini 2.0 Flash",
+    "gemini-flash-lite-latest": "Gemini Flash Lite Latest",
+    "gemini-2.5-flash-lite": "Gemini 2.5 Flash Lite",
+    "gemini-2.0-flash-lite": "Gemini 2.0 Flash Lite",
+    "gemma-3-27b": "Gemma 3 27B",
+    "gemma-3-12b": "Gemma 3 12B",
+    "gemma-3-4b": "Gemma 3 4B",
+    "gemma-3-2b": "Gemma 3 2B",
+    "gemma-3-1b": "Gemma 3 1B",
+}
+
+# Cache keys for rate limit exhaustion (shared across all workers). The value
+# is the timestamp at which the exhaustion ends.
 CACHE_KEY_EXHAUSTED = "model_fallback_exhausted"
 EXHAUSTION_RESET_TIME = 300  # Reset after 5 minutes
 
+# Per-worker mirror of the shared flag, so the check before every generation
+# (and every page render) is normally answered from memory. Exhaustion seen
+# by this worker is trusted until it expires; "not exhausted" is re-read from
+# the cache at most every EXHAUSTION_CHECK_INTERVAL seconds.
+EXHAUSTION_CHECK_INTERVAL = 5
+_all_models_exhausted = False
+_exhaustion_timestamp = 0.0  # When the exhaustion began (time.time())
+_exhaustion_checked_at = float("-inf")  # Last cache read (time.monotonic())
+
+# Per-model circuit breakers (shared across all workers). A model that is
+# rate limited or unavailable is skipped by every request until its cooldown
+# ends; the cooldown doubles with each consecutive failure and is reset by a
+# success. Values are (cooldown_until, consecutive_failures).
+CACHE_PREFIX_MODEL_COOLDOWN = "model_fallback_breaker_"
+MODEL_COOLDOWN_TIME = 60
+MAX_MODEL_COOLDOWN_TIME = 600
+_COOLDOWN_KEYS = {
+    f"{CACHE_PREFIX_MODEL_COOLDOWN}{model}": model for model in MODEL_HIERARCHY
+}
+
+# Recent outcomes per model (shared across all workers), as decayed
+# (successes, failures) counts, used to pick the first model to try. Starting
+# at the top of the hierarchy is preferred; a model is passed over when a
+# success rate drawn from its Beta(successes, failures) posterior falls below
+# ROUTING_MIN_SUCCESS_RATE (Thompson sampling), so models that keep failing
+# are mostly skipped but still probed now and then to notice recovery.
+CACHE_PREFIX_MODEL_STATS = "model_fallback_stats_"
+MODEL_STATS_TIMEOUT = 3600
+ROUTING_STATS_DECAY = 0.95  # Roughly the last 20 outcomes count
+ROUTING_PRIOR_SUCCESSES = 9  # Models without history are tried first
+ROUTING_MIN_SUCCESS_RATE = 0.5
+ROUTING_EXPLORE_RATE = 0.05
+# Outcomes that move neither count by this much aren't written back, so a
+# model that keeps succeeding stops costing a cache write per call. Stored
+# counts then lag by at most ROUTING_STATS_MIN_CHANGE / (1 - decay) = 1 call.
+ROUTING_STATS_MIN_CHANGE = 0.05
+_STATS_KEYS = {f"{CACHE_PREFIX_MODEL_STATS}{model}": model for model in MODEL_HIERARCHY}
+
+# Generated responses, keyed by a hash of the full prompt and the model
+# hierarchy, so repeated identical prompts (e.g. a resubmitted message) are
+# answered without calling the API
+CACHE_PREFIX_RESPONSE = "model_fallback_response_"
+RESPONSE_CACHE_TIMEOUT = 3600
+_RESPONSE_KEY_SALT = f"{','.join(MODEL_HIERARCHY)}\n".encode()
+
+# Generations in progress in this worker, keyed by response cache key, so
+# identical prompts submitted together wait for one API call
+_inflight_responses = {}
+_inflight_lock = threading.Lock()
+
 # Retry settings for transient errors
 MAX_RETRIES_PER_MODEL = 2
 INITIAL_RETRY_DELAY = 0.5  # seconds
+# Longest wait before retrying the same model; if the API asks for more,
+# fall back to the next model instead of holding the worker thread
+MAX_RETRY_DELAY = 2.0  # seconds
+# Up to this fraction is added to each retry delay at random, so requests
+# that were rate limited together don't all retry at the same instant
+RETRY_JITTER = 0.5
+
+# A model that hasn't answered within MODEL_TIMEOUT is treated as unavailable
+# and the next one is tried. GENERATION_DEADLINE bounds the whole fallback
+# chain below gunicorn's 120s worker timeout.
+MODEL_TIMEOUT = 30  # seconds
+GENERATION_DEADLINE = 90  # seconds
+
+# Shared Gemini client, created on first use so its HTTP connections are
+# kept alive across generations instead of reconnecting for every request
+_client = None
+_client_lock = threading.Lock()
+
+# Error message fragments, matched case-insensitively anywhere in the message.
+# Compiled once so classifying an error is a single regex scan rather than a
+# lowercased copy of the message plus one substring search per keyword.
+# Timeouts are matched by their status and transport errors only (504,
+# DEADLINE_EXCEEDED, "timed out", and httpx.TimeoutException by type), not
+# the bare word "timeout", which also appears in client-side config errors.
+_RATE_LIMIT_KEYWORDS = (
+    r"429|503|rate limit|quota|overloaded|temporarily unavailable|too many requests"
+)
+_UNAVAILABLE_MODEL_KEYWORDS = (
+    r"404|not found|not_found|not supported|not available"
+    r"|504|deadline_exceeded|timed out"
+)
+# Quota errors (a subset of rate limit errors) do not clear within the retry
+# delay, so they fall back immediately instead of sleeping
+_QUOTA_KEYWORDS = r"429|rate limit|quota|too many requests"
+RATE_LIMIT_ERROR_PATTERN = re.compile(_RATE_LIMIT_KEYWORDS, re.IGNORECASE)
+QUOTA_ERROR_PATTERN = re.compile(_QUOTA_KEYWORDS, re.IGNORECASE)
+_MODEL_NOT_FOUND_PATTERN = re.compile(r"404|not found", re.IGNORECASE)
+FALLBACK_ERROR_PATTERN = re.compile(
+    f"{_UNAVAILABLE_MODEL_KEYWORDS}|{_RATE_LIMIT_KEYWORDS}", re.IGNORECASE
+)
 
 
 class ModelExhaustionError(Exception):
@@ -75,29 +216,277 @@ class ModelExhaustionError(Exception):
     pass
 
 
+def _get_client():
+    """Return the shared Gemini client, creating it on first use.
+
+    Returns:
+        genai.Client: Client authenticated with GEMINI_API_KEY.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    return _client
+
+
+def reset_client():
+    """Discard the shared Gemini client.
+
+    The next generation creates a new client, re-reading GEMINI_API_KEY
+    (e.g. after the key has been rotated).
+    """
+    global _client
+    with _client_lock:
+        _client = None
+
+
+def _mark_exhausted(exhausted_at):
+    """Record in this worker that all models are exhausted.
+
+    Args:
+        exhausted_at: The time.time() timestamp the exhaustion began.
+    """
+    global _all_models_exhausted, _exhaustion_timestamp
+    _exhaustion_timestamp = exhausted_at
+    _all_models_exhausted = True
+
+
+def reset_exhaustion_if_needed():
+    """Reset this worker's exhaustion flag after EXHAUSTION_RESET_TIME.
+
+    Returns:
+        bool: True if the flag was reset, False otherwise.
+    """
+    global _all_models_exhausted
+    if (
+        _all_models_exhausted
+        and time.time() - _exhaustion_timestamp >= EXHAUSTION_RESET_TIME
+    ):
+        _all_models_exhausted = False
+        logger.info("Model exhaustion period elapsed, flag reset")
+        return True
+    return False
+
+
 def is_models_exhausted():
     """Check if all models are currently exhausted.
 
-    Uses Django cache to check exhaustion state shared across workers.
+    The exhaustion state is shared across workers through the Django
+    cache and mirrored in each worker, so the cache is read at most once
+    every EXHAUSTION_CHECK_INTERVAL seconds per worker.
 
     Returns:
         bool: True if all models are exhausted, False otherwise.
     """
-    return cache.get(CACHE_KEY_EXHAUSTED, False)
+    global _exhaustion_checked_at
+    reset_exhaustion_if_needed()
+    if _all_models_exhausted:
+        return True
+
+    now = time.monotonic()
+    if now - _exhaustion_checked_at < EXHAUSTION_CHECK_INTERVAL:
+        return False
+    _exhaustion_checked_at = now
+
+    exhausted_until = cache.get(CACHE_KEY_EXHAUSTED)
+    if exhausted_until and time.time() < exhausted_until:
+        _mark_exhausted(exhausted_until - EXHAUSTION_RESET_TIME)
+        return True
+    return False
 
 
 def set_models_exhausted():
-    """Mark all models as exhausted in the cache.
+    """Mark all models as exhausted for every worker.
 
-    Sets a cache key that expires after EXHAUSTION_RESET_TIME seconds,
-    providing automatic recovery without manual intervention.
+    Stores the end of the exhaustion period in a cache key that expires
+    after EXHAUSTION_RESET_TIME seconds, providing automatic recovery
+    without manual intervention, and sets this worker's flag directly.
     """
-    cache.set(CACHE_KEY_EXHAUSTED, True, timeout=EXHAUSTION_RESET_TIME)
+    now = time.time()
+    cache.set(
+        CACHE_KEY_EXHAUSTED, now + EXHAUSTION_RESET_TIME, timeout=EXHAUSTION_RESET_TIME
+    )
+    _mark_exhausted(now)
     logger.warning(
         "All models exhausted, cache flag set for %ds", EXHAUSTION_RESET_TIME
     )
 
 
+def get_model_cooldowns():
+    """Return the circuit breaker state of models that failed recently.
+
+    Reads every model's cooldown key in a single cache round trip.
+
+    Returns:
+        dict: Maps model names to ``(cooldown_until, failures)``, where
+            ``failures`` counts consecutive failures. Models without
+            recent failures are absent. Empty if the cache is unavailable.
+    """
+    try:
+        cooldowns = cache.get_many(_COOLDOWN_KEYS)
+    except Exception as e:
+        logger.warning("Could not read model cooldowns: %s", e)
+        return {}
+    return {_COOLDOWN_KEYS[key]: state for key, state in cooldowns.items()}
+
+
+def set_model_cooldown(model_name, duration=None, failures=0):
+    """Skip a model in every worker for a while (open its circuit breaker).
+
+    Args:
+        model_name: The model that was rate limited or unavailable.
+        duration: Seconds to skip the model for, e.g. the retry delay the
+            API suggested. Defaults to MODEL_COOLDOWN_TIME, doubled for
+            each earlier consecutive failure. Capped at
+            MAX_MODEL_COOLDOWN_TIME.
+        failures: Consecutive failures recorded before this one.
+    """
+    failures += 1
+    if duration is None:
+        duration = MODEL_COOLDOWN_TIME * 2 ** min(failures - 1, 10)
+    duration = max(1, min(int(duration), MAX_MODEL_COOLDOWN_TIME))
+    try:
+        # Kept past the cooldown so a failed probe afterwards still sees
+        # the failure count and backs off further
+        cache.set(
+            f"{CACHE_PREFIX_MODEL_COOLDOWN}{model_name}",
+            (time.time() + duration, failures),
+            timeout=duration + MAX_MODEL_COOLDOWN_TIME,
+        )
+    except Exception as e:
+        logger.warning("Could not set cooldown for %s: %s", model_name, e)
+
+
+def clear_model_cooldown(model_name):
+    """Forget a model's failures (close its circuit breaker).
+
+    Args:
+        model_name: The model that has just succeeded.
+    """
+    try:
+        cache.delete(f"{CACHE_PREFIX_MODEL_COOLDOWN}{model_name}")
+    except Exception as e:
+        logger.warning("Could not clear cooldown for %s: %s", model_name, e)
+
+
+def get_model_stats():
+    """Return recent call outcomes for each model.
+
+    Returns:
+        dict: Maps model names to decayed ``(successes, failures)`` counts.
+            Models without recent calls are absent. Empty if the cache
+            is unavailable.
+    """
+    try:
+        stats = cache.get_many(_STATS_KEYS)
+    except Exception as e:
+        logger.warning("Could not read model stats: %s", e)
+        return {}
+    return {_STATS_KEYS[key]: counts for key, counts in stats.items()}
+
+
+def get_model_state():
+    """Return every model's circuit breaker state and recent outcomes.
+
+    Reads the cooldown and statistics keys in a single cache round trip.
+
+    Returns:
+        tuple: ``(cooldowns, stats)`` as returned by get_model_cooldowns
+            and get_model_stats. Both are empty if the cache is
+            unavailable.
+    """
+    try:
+        entries = cache.get_many([*_COOLDOWN_KEYS, *_STATS_KEYS])
+    except Exception as e:
+        logger.warning("Could not read model state: %s", e)
+        return {}, {}
+    cooldowns = {
+        _COOLDOWN_KEYS[key]: value
+        for key, value in entries.items()
+        if key in _COOLDOWN_KEYS
+    }
+    stats = {
+        _STATS_KEYS[key]: value for key, value in entries.items() if key in _STATS_KEYS
+    }
+    return cooldowns, stats
+
+
+def record_model_outcome(model_name, succeeded, counts=(0.0, 0.0)):
+    """Add the outcome of a call to a model's recent statistics.
+
+    Concurrent updates may overwrite each other; the counts only need to
+    be roughly right to steer routing. For the same reason nothing is
+    written when neither count changes by ROUTING_STATS_MIN_CHANGE.
+
+    Args:
+        model_name: The model that was called.
+        succeeded: Whether the call returned a response.
+        counts: The model's ``(successes, failures)`` before this call,
+            as returned by get_model_stats.
+    """
+    successes, failures = (count * ROUTING_STATS_DECAY for count in counts)
+    if succeeded:
+        successes += 1
+    else:
+        failures += 1
+    if (
+        abs(successes - counts[0]) < ROUTING_STATS_MIN_CHANGE
+        and abs(failures - counts[1]) < ROUTING_STATS_MIN_CHANGE
+    ):
+        return
+    try:
+        cache.set(
+            f"{CACHE_PREFIX_MODEL_STATS}{model_name}",
+            (successes, failures),
+            timeout=MODEL_STATS_TIMEOUT,
+        )
+    except Exception as e:
+        logger.warning("Could not record stats for %s: %s", model_name, e)
+
+
+def pick_start_index(models, stats):
+    """Choose which model to try first.
+
+    Walks the models in order and returns the first whose success rate,
+    sampled from its Beta posterior, reaches ROUTING_MIN_SUCCESS_RATE.
+    A small fraction of requests always start at the first model.
+
+    Args:
+        models: Candidate model names, most powerful first.
+        stats: Recent outcomes, as returned by get_model_stats.
+
+    Returns:
+        int: Index into ``models`` of the model to try first; 0 if no
+            model qualifies.
+    """
+    if random.random() < ROUTING_EXPLORE_RATE:
+        return 0
+    for index, model_name in enumerate(models):
+        successes, failures = stats.get(model_name, (0.0, 0.0))
+        sampled_rate = random.betavariate(
+            successes + ROUTING_PRIOR_SUCCESSES, failures + 1
+        )
+        if sampled_rate >= ROUTING_MIN_SUCCESS_RATE:
+            return index
+    return 0
+
+
+def _response_cache_key(full_prompt):
+    """Build the response cache key for a prompt.
+
+    Args:
+        full_prompt: The complete prompt sent to the model, including
+            any system instruction.
+
+    Returns:
+        str: Cache key derived from a SHA-256 of the prompt and the
+            model hierarchy.
+    """
+    digest = hashlib.sha256(_RESPONSE_KEY_SALT + full_prompt.encode()).hexdigest()
+    return f"{CACHE_PREFIX_RESPONSE}{digest}"
+
+
 def is_rate_limit_error(error_str):
     """Check if an error string indicates a rate limit or transient error.
 
@@ -111,19 +500,58 @@ def is_rate_limit_error(error_str):
         bool: True if the error indicates rate limiting or temporary
             unavailability, False otherwise.
     """
-    error_lower = error_str.lower()
-    return any(
-        keyword in error_lower
-        for keyword in [
-            "429",
-            "503",
-            "rate limit",
-            "quota",
-            "overloaded",
-            "temporarily unavailable",
-            "too many requests",
-        ]
-    )
+    return RATE_LIMIT_ERROR_PATTERN.search(error_str) is not None
+
+
+def is_quota_error(error_str):
+    """Check if an error string indicates an exhausted request quota.
+
+    Quota errors are rate limit errors that persist for the rest of the
+    quota window, unlike transient overload (503) errors.
+
+    Args:
+        error_str: The error message string to check.
+
+    Returns:
+        bool: True if the error indicates a quota or request rate limit,
+            False otherwise.
+    """
+    return QUOTA_ERROR_PATTERN.search(error_str) is not None
+
+
+def get_retry_delay(error):
+    """Read the retry delay the API suggested for a failed request.
+
+    Gemini errors carry a ``google.rpc.RetryInfo`` entry such as
+    ``{"retryDelay": "37s"}`` in their details; plain HTTP errors may
+    carry a numeric ``Retry-After`` header instead.
+
+    Args:
+        error: The exception raised by the Gemini client.
+
+    Returns:
+        float or None: The suggested delay in seconds, or None if the
+            error does not include one.
+    """
+    details = getattr(error, "details", None)
+    if isinstance(details, dict):
+        error_info = details.get("error")
+        for item in (error_info or {}).get("details") or []:
+            retry_delay = item.get("retryDelay") if isinstance(item, dict) else None
+            if isinstance(retry_delay, str) and retry_delay.endswith("s"):
+                try:
+                    return float(retry_delay[:-1])
+                except ValueError:
+                    pass
+
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    retry_after = headers.get("retry-after") if headers is not None else None
+    if retry_after:
+        try:
+            return float(retry_after)
+        except (TypeError, ValueError):
+            pass
+    return None
 
 
 def is_fallback_error(error_str):
@@ -140,33 +568,16 @@ def is_fallback_error(error_str):
         bool: True if the error should trigger fallback to the next
             model, False for non-recoverable errors.
     """
-    error_lower = error_str.lower()
-    return any(
-        keyword in error_lower
-        for keyword in [
-            "404",
-            "not found",
-            "not_found",
-            "not supported",
-            "not available",
-            "429",
-            "503",
-            "rate limit",
-            "quota",
-            "overloaded",
-            "temporarily unavailable",
-            "too many requests",
-        ]
-    )
+    return FALLBACK_ERROR_PATTERN.search(error_str) is not None
 
 
 def generate_with_fallback(prompt, system_instruction=""):
     """Generate an AI response with automatic model fallback.
 
     Attempts to generate a response using models in the hierarchy,
-    starting from the most powerful. If a model fails due to rate
-    limits or unavailability, automatically falls back to the next
-    model in the hierarchy.
+    starting from the most powerful one that has been succeeding
+    recently. If a model fails due to rate limits or unavailability,
+    automatically falls back to the next model in the hierarchy.
 
     Args:
         prompt: The user's prompt or question to send to the AI.
@@ -179,6 +590,65 @@ def generate_with_fallback(prompt, system_instruction=""):
             - model_used (str): The internal name of the model that
                 successfully generated the response.
 
+    Raises:
+        ModelExhaustionError: If all models in the hierarchy fail due
+            to rate limits or temporary unavailability.
+        Exception: For non-recoverable errors such as API key issues
+            or authentication failures.
+    """
+    # Build the full prompt with system instruction
+    full_prompt = f"{system_instruction}\n\n{prompt}" if system_instruction else prompt
+
+    # Identical prompts are answered from the cache, even while exhausted
+    response_key = _response_cache_key(full_prompt)
+    try:
+        cached = cache.get(response_key)
+    except Exception as e:
+        logger.warning("Could not read cached response: %s", e)
+        cached = None
+    if cached:
+        logger.info("Reusing cached response from %s", cached["model"])
+        return cached["text"], cached["model"]
+
+    # Identical prompts already being generated in this worker share that call
+    with _inflight_lock:
+        inflight = _inflight_responses.get(response_key)
+        if inflight is None:
+            future = _inflight_responses[response_key] = Future()
+    if inflight is not None:
+        logger.info("Waiting for in-flight generation of an identical prompt")
+        return inflight.result()
+
+    try:
+        ai_text, model_used = _generate_with_fallback(full_prompt)
+        try:
+            cache.set(
+                response_key,
+                {"text": ai_text, "model": model_used},
+                timeout=RESPONSE_CACHE_TIMEOUT,
+            )
+        except Exception as e:
+            logger.warning("Could not cache response: %s", e)
+        future.set_result((ai_text, model_used))
+        return ai_text, model_used
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight_responses.pop(response_key, None)
+
+
+def _generate_with_fallback(full_prompt):
+    """Call the available models in turn until one succeeds.
+
+    Args:
+        full_prompt: The complete prompt, including any system instruction.
+
+    Returns:
+        tuple: A tuple of (response_text, model_used), as returned by
+            generate_with_fallback.
+
     Raises:
         ModelExhaustionError: If all models in the hierarchy fail due
             to rate limits or temporary unavailability.
@@ -192,35 +662,59 @@ def generate_with_fallback(prompt, system_instruction=""):
             "All model rate limits reached. Please try again later."
         )
 
-    # Initialize client
+    # Get the shared client
     try:
-        # Create client with API key - works for Gemini Developer API
-        client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+        # Client with API key - works for Gemini Developer API
+        client = _get_client()
     except Exception as e:
         logger.error("Failed to initialize Gemini client: %s", e)
         raise Exception("API configuration error. Please contact administrator.") from e
 
-    # Build the full prompt with system instruction
-    full_prompt = f"{system_instruction}\n\n{prompt}" if system_instruction else prompt
-
-    # Try each model in the hierarchy
-    for model_index, model_name in enumerate(MODEL_HIERARCHY):
-        logger.info(
-            "Attempting model %s/%s: %s",
-            model_index + 1,
-            len(MODEL_HIERARCHY),
-            model_name,
+    # Try each model not in cooldown, starting from the one recent outcomes
+    # favour and falling back down the hierarchy; models passed over at the
+    # start are tried last
+    cooldowns, stats = get_model_state()
+    now = time.time()
+    available = [
+        model_name
+        for model_name in MODEL_HIERARCHY
+        if cooldowns.get(model_name, (0, 0))[0] <= now
+    ]
+    start = pick_start_index(available, stats)
+    deadline = time.monotonic() + GENERATION_DEADLINE
+    out_of_time = False
+    attempt_order = available[start:] + available[:start]
+    for position, model_name in enumerate(attempt_order, 1):
+        if deadline - time.monotonic() < 1:
+            logger.warning("Generation deadline reached before trying %s", model_name)
+            out_of_time = True
+            models_tried = position - 1
+            break
+        failures = cooldowns.get(model_name, (0, 0))[1]
+        model_stats = stats.get(model_name, (0.0, 0.0))
+        logger.debug(
+            "Attempting model %s/%s: %s", position, len(attempt_order), model_name
         )
 
         # Try this model with retries for transient errors
         for attempt in range(MAX_RETRIES_PER_MODEL):
             try:
+                timeout = min(MODEL_TIMEOUT, deadline - time.monotonic())
                 response = client.models.generate_content(
-                    model=model_name, contents=full_prompt
+                    model=model_name,
+                    contents=full_prompt,
+                    config=types.GenerateContentConfig(
+                        http_options=types.HttpOptions(
+                            timeout=max(1000, int(timeout * 1000))
+                        )
+                    ),
                 )
 
                 # Success! Return the response and model used
-                logger.info("Success with %s on attempt %s", model_name, attempt + 1)
+                logger.debug("Success with %s on attempt %s", model_name, attempt + 1)
+                if failures:
+                    clear_model_cooldown(model_name)
+                record_model_outcome(model_name, True, model_stats)
                 return response.text, model_name
 
             except Exception as e:
@@ -228,44 +722,69 @@ def generate_with_fallback(prompt, system_instruction=""):
                 last_error = e
 
                 # Check if this error should trigger fallback
-                if is_fallback_error(error_str):
+                if isinstance(e, httpx.TimeoutException) or is_fallback_error(
+                    error_str
+                ):
                     # This is a recoverable error (rate limit, not found, etc.)
-                    if "404" in error_str or "not found" in error_str.lower():
+                    if _MODEL_NOT_FOUND_PATTERN.search(error_str):
                         logger.warning(
-                            "Model %s not available (404): %s... Moving to next model",
+                            "Model %s not available (404): %.100s... "
+                            "Moving to next model",
                             model_name,
-                            error_str[:100],
+                            error_str,
                         )
                         # Don't retry 404s, move to next model immediately
+                        set_model_cooldown(model_name, failures=failures)
+                        record_model_outcome(model_name, False, model_stats)
                         break
                     elif is_rate_limit_error(error_str):
                         logger.warning(
-                            "Rate limit hit for %s (attempt %s/%s): %s...",
+                            "Rate limit hit for %s (attempt %s/%s): %.100s...",
                             model_name,
                             attempt + 1,
                             MAX_RETRIES_PER_MODEL,
-                            error_str[:100],
+                            error_str,
                         )
-                        # If this is not the last retry for this model, wait and retry
-                        if attempt < MAX_RETRIES_PER_MODEL - 1:
-                            delay = INITIAL_RETRY_DELAY * (2**attempt)
-                            logger.info("Retrying %s in %ss...", model_name, delay)
+                        # Retry transient overloads after a short wait, using
+                        # the delay the API suggested when it gave one. Quota
+                        # errors won't clear that fast, so don't hold the
+                        # worker thread sleeping; fall back immediately.
+                        suggested_delay = get_retry_delay(e)
+                        delay = (
+                            suggested_delay
+                            if suggested_delay is not None
+                            else INITIAL_RETRY_DELAY * (2**attempt)
+                        )
+                        can_retry = (
+                            attempt < MAX_RETRIES_PER_MODEL - 1
+                            and not is_quota_error(error_str)
+                            and delay <= MAX_RETRY_DELAY
+                        )
+                        if can_retry:
+                            delay *= 1 + random.uniform(0, RETRY_JITTER)
+                            logger.info("Retrying %s in %.2fs...", model_name, delay)
                             time.sleep(delay)
                             continue
                         else:
-                            # Max retries for this model reached, move to next model
+                            # Quota hit or max retries reached, move to next model
                             logger.warning(
-                                "Max retries reached for %s, moving to next model",
+                                "Giving up on %s, moving to next model",
                                 model_name,
                             )
+                            set_model_cooldown(
+                                model_name, suggested_delay, failures=failures
+                            )
+                            record_model_outcome(model_name, False, model_stats)
                             break
                     else:
-                        # Other fallback error, move to next model
+                        # Other fallback error (e.g. a timeout), move to next model
                         logger.warning(
-                            "Error with %s: %s... Moving to next model",
+                            "Error with %s: %.100s... Moving to next model",
                             model_name,
-                            error_str[:100],
+                            error_str,
                         )
+                        set_model_cooldown(model_name, failures=failures)
+                        record_model_outcome(model_name, False, model_stats)
                         break
                 else:
                     # Non-recoverable error (API key issues, etc.)
@@ -274,6 +793,22 @@ def generate_with_fallback(prompt, system_instruction=""):
                     )
                     raise
 
+    # Every model is cooling down, or time ran out before every model was
+    # tried; neither means all models are exhausted, so don't set the longer
+    # global exhaustion flag
+    if not available or out_of_time:
+        if out_of_time:
+            logger.warning(
+                "Generation deadline of %ss reached after trying %d models",
+                GENERATION_DEADLINE,
+                models_tried,
+            )
+        else:
+            logger.warning("All models in cooldown, rejecting request")
+        raise ModelExhaustionError(
+            "All model rate limits reached. Please try again later."
+        )
+
     # If we get here, all models failed with rate limits
     logger.error("All %s models exhausted", len(MODEL_HIERARCHY))
     set_models_exhausted()
@@ -296,28 +831,14 @@ def get_model_display_name(model_name):
         str: The user-friendly display name (e.g., 'Gemini 2.5 Flash').
             Returns the original model_name if no mapping exists.
     """
-    name_map = {
-        "gemini-3-flash-preview": "Gemini 3 Flash",
-        "gemini-flash-latest": "Gemini Flash Latest",
-        "gemini-2.5-flash": "Gemini 2.5 Flash",
-        "gemini-2.0-flash": "Gemini 2.0 Flash",
-        "gemini-flash-lite-latest": "Gemini Flash Lite Latest",
-        "gemini-2.5-flash-lite": "Gemini 2.5 Flash Lite",
-        "gemini-2.0-flash-lite": "Gemini 2.0 Flash Lite",
-        "gemma-3-27b": "Gemma 3 27B",
-        "gemma-3-12b": "Gemma 3 12B",
-        "gemma-3-4b": "Gemma 3 4B",
-        "gemma-3-2b": "Gemma 3 2B",
-        "gemma-3-1b": "Gemma 3 1B",
-    }
-    return name_map.get(model_name, model_name)
+    return MODEL_DISPLAY_NAMES.get(model_name, model_name)
 
 
 def check_service_availability():
     """Check if the AI service is currently available.
 
-    Checks the cache-based model exhaustion status to determine if AI
-    responses can be generated. The cache auto-expires after
+    Checks the shared model exhaustion status to determine if AI
+    responses can be generated. Exhaustion ends automatically after
     EXHAUSTION_RESET_TIME seconds.
 
     Returns:
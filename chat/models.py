@@ -9,12 +9,68 @@ The models support RAG (Retrieval-Augmented Generation) by linking
 documents to specific chat sessions for context-aware responses.
 """
 
+import threading
+
 import markdown
 from django.contrib.auth import get_user_model
 from django.db import models
 
 User = get_user_model()
 
+# Markdown instances load their extensions when created and can be reset and
+# reused, but aren't thread-safe, so each thread keeps its own
+_markdown_local = threading.local()
+
+
+def _get_markdown():
+    """Return this thread's Markdown converter, creating it on first use.
+
+    Returns:
+        markdown.Markdown: Converter configured for chat messages, reset
+            and ready for a new document.
+    """
+    md = getattr(_markdown_local, "md", None)
+    if md is None:
+        md = _markdown_local.md = markdown.Markdown(
+            extensions=[
+                "extra",  # Includes tables, footnotes, abbr, etc.
+                "fenced_code",  # Support for ``` code blocks
+                "codehilite",  # Syntax highlighting in code blocks
+                "tables",  # Table support
+                "nl2br",  # Convert newlines to <br> tags for readability
+                "sane_lists",  # Better list handling
+            ],
+            extension_configs={
+                "codehilite": {
+                    "css_class": "highlight",
+                    "linenums": False,
+                    # Guessing tries every Pygments lexer on unlabelled
+                    # blocks; they're left plain for highlight.js instead
+                    "guess_lang": False,
+                }
+            },
+            output_format="html5",
+        )
+    return md.reset()
+
+
+def _render_markdown(content):
+    """Render chat message Markdown to HTML.
+
+    Args:
+        content: The Markdown text, or None.
+
+    Returns:
+        str: The rendered HTML.
+    """
+    content = content or ""
+
+    # Normalize line endings
+    content = content.replace("\r\n", "\n").replace("\r", "\n")
+
+    # Render markdown to HTML
+    return _get_markdown().convert(content)
+
 
 class ChatSession(models.Model):
     """Represents a chat conversation session.
@@ -86,6 +142,7 @@ class Document(models.Model):
 
         indexes = [
             models.Index(fields=["session", "-uploaded_at"]),
+            models.Index(fields=["-uploaded_at"]),
         ]
         ordering = ["-uploaded_at"]
 
@@ -112,6 +169,8 @@ class Message(models.Model):
         content (str): The text content of the message.
         model_used (str): The AI model that generated this response
             (only for assistant messages).
+        html_content (str): The content rendered to HTML, stored when an
+            assistant message is saved so history pages don't re-render it.
         created_at (datetime): When the message was created.
 
     Meta:
@@ -126,6 +185,7 @@ class Message(models.Model):
     role = models.CharField(max_length=10, choices=SESSION_ROLES)
     content = models.TextField()
     model_used = models.CharField(max_length=100, blank=True, null=True, default=None)
+    html_content = models.TextField(blank=True, default="", editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -133,10 +193,32 @@ class Message(models.Model):
 
         indexes = [
             models.Index(fields=["session", "created_at"]),
+            # Admin changelist: newest first, optionally filtered by role
+            models.Index(fields=["-created_at"]),
+            models.Index(fields=["role", "-created_at"]),
         ]
         ordering = ["created_at"]
 
-    def get_html_content(self):
+    def save(self, *args, **kwargs):
+        """Save the message, rendering assistant content to HTML first.
+
+        The HTML is only re-rendered when the content is being saved, so
+        saves limited to other fields via ``update_fields`` skip it.
+
+        Args:
+            *args: Positional arguments passed to Model.save().
+            **kwargs: Keyword arguments passed to Model.save().
+        """
+        update_fields = kwargs.get("update_fields")
+        if self.role == "assistant" and (
+            update_fields is None or "content" in update_fields
+        ):
+            self.html_content = self.render_html()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "html_content"}
+        super().save(*args, **kwargs)
+
+    def render_html(self):
         """Render the message content as HTML with Markdown formatting.
 
         Converts Markdown-formatted text to HTML with support for:
@@ -148,30 +230,18 @@ class Message(models.Model):
         Returns:
             str: The message content rendered as safe HTML.
         """
-        content = self.content or ""
+        return _render_markdown(self.content)
 
-        # Normalize line endings
-        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    def get_html_content(self):
+        """Return the message content as HTML with Markdown formatting.
 
-        # Render markdown to HTML
-        html_content = markdown.markdown(
-            content,
-            extensions=[
-                "extra",  # Includes tables, footnotes, abbr, etc.
-                "fenced_code",  # Support for ``` code blocks
-                "codehilite",  # Syntax highlighting in code blocks
-                "tables",  # Table support
-                "nl2br",  # Convert newlines to <br> tags for readability
-                "sane_lists",  # Better list handling
-            ],
-            extension_configs={
-                "codehilite": {
-                    "css_class": "highlight",
-                    "linenums": False,
-                    "guess_lang": True,
-                }
-            },
-            output_format="html5",
-        )
+        Uses the HTML stored when the message was saved (existing assistant
+        messages were backfilled by migration 0007). Messages without
+        stored HTML are rendered on the fly; nothing is written.
 
-        return html_content
+        Returns:
+            str: The message content rendered as safe HTML.
+        """
+        if self.html_content or not self.content:
+            return self.html_content
+        return self.render_html()
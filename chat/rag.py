@@ -13,16 +13,23 @@ The RAG pipeline:
     6. Clean up vectors when sessions/documents are deleted
 
 Functions:
-    get_clients: Initialize and return API clients.
+    get_clients: Return the shared API clients.
+    reset_clients: Discard the shared API clients.
     extract_text_from_pdf: Extract text content from a PDF file.
     ingest_document: Process and store document embeddings.
     retrieve_context: Retrieve relevant context for a query.
+    invalidate_context_cache: Forget cached context for a session.
     delete_session_vectors: Delete all vectors for a session.
     delete_document_vectors: Delete vectors for a specific document.
 """
 
+import hashlib
 import os
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.cache import cache
 from google import genai
 from pinecone import Pinecone
 from pypdf import PdfReader
@@ -31,13 +38,26 @@ from dotenv import load_dotenv
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Shared clients, created on first use so their HTTP connections are kept
+# alive across requests instead of reconnecting for every query
+_clients = None
+_clients_lock = threading.Lock()
+
+# Retrieved context, keyed by session and normalised query, so a repeated or
+# resent question skips the embedding call and the Pinecone query. Each entry
+# records the session's context version when it was stored; uploading or
+# removing a document changes the version, which invalidates the entries.
+CACHE_PREFIX_CONTEXT = "rag_context_"
+CACHE_PREFIX_CONTEXT_VERSION = "rag_context_version_"
+CONTEXT_CACHE_TIMEOUT = 300
+
 
 # 1. Initialize Clients
 def get_clients():
-    """Initialize and return Google GenAI and Pinecone clients.
+    """Return the shared Google GenAI and Pinecone clients.
 
     Creates authenticated clients for the Gemini API and Pinecone
-    vector database using environment variables.
+    vector database from environment variables on first use.
 
     Returns:
         tuple: A tuple of (google_client, pinecone_index) where:
@@ -48,15 +68,31 @@ def get_clients():
         Exception: If client initialization fails due to missing
             credentials or connection issues.
     """
-    try:
-        google_client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-        pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-        index_name = os.getenv("PINECONE_INDEX_NAME", "nexus-index")
-        index = pc.Index(index_name)
-        return google_client, index
-    except Exception as e:
-        logger.error("Failed to initialize clients: %s", e)
-        raise
+    global _clients
+    if _clients is not None:
+        return _clients
+    with _clients_lock:
+        if _clients is None:
+            try:
+                google_client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+                pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+                index_name = os.getenv("PINECONE_INDEX_NAME", "nexus-index")
+                _clients = (google_client, pc.Index(index_name))
+            except Exception as e:
+                logger.error("Failed to initialize clients: %s", e)
+                raise
+    return _clients
+
+
+def reset_clients():
+    """Discard the shared clients.
+
+    The next call to get_clients creates new ones, re-reading the
+    environment (e.g. after an API key has been rotated).
+    """
+    global _clients
+    with _clients_lock:
+        _clients = None
 
 
 # 2. PDF Processor (Updated for Cloud)
@@ -80,9 +116,7 @@ def extract_text_from_pdf(pdf_file):
     try:
         # Pass the file object directly to PdfReader
         reader = PdfReader(pdf_file)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
+        text = "".join(page.extract_text() + "\n" for page in reader.pages)
         if not text.strip():
             raise ValueError("PDF contains no extractable text")
         return text
@@ -91,6 +125,62 @@ def extract_text_from_pdf(pdf_file):
         raise ValueError(f"Failed to extract text from PDF: {str(e)}")
 
 
+def _embed_batch(
+    google_client, file_identifier, session_id, batch_start, batch_chunks
+):
+    """Embed a batch of chunks in one API call and build their vectors.
+
+    Args:
+        google_client: Authenticated genai.Client.
+        file_identifier: Document identifier used in vector IDs and metadata.
+        session_id: Session ID stored in the vector metadata.
+        batch_start: Index of the batch's first chunk within the document.
+        batch_chunks: The chunk texts to embed.
+
+    Returns:
+        list: Pinecone vector dicts, in chunk order.
+
+    Raises:
+        ValueError: If the API returns a different number of embeddings
+            than chunks.
+        Exception: If the embedding request fails.
+    """
+    try:
+        response = google_client.models.embed_content(
+            model="gemini-embedding-001",
+            contents=batch_chunks,
+            config={"output_dimensionality": 768},
+        )
+    except Exception as e:
+        logger.error("Failed to embed batch starting at chunk %s: %s", batch_start, e)
+        raise
+
+    if len(response.embeddings) != len(batch_chunks):
+        raise ValueError(
+            f"Expected {len(batch_chunks)} embeddings for batch starting at chunk "
+            f"{batch_start}, got {len(response.embeddings)}"
+        )
+
+    vectors = [
+        {
+            "id": f"{file_identifier}_{batch_start + idx}",
+            "values": embedding.values,
+            "metadata": {
+                "text": chunk,
+                "source": file_identifier,
+                "session_id": session_id,
+            },
+        }
+        for idx, (chunk, embedding) in enumerate(
+            zip(batch_chunks, response.embeddings)
+        )
+    ]
+    logger.info(
+        "Embedded chunks %s-%s", batch_start, batch_start + len(batch_chunks) - 1
+    )
+    return vectors
+
+
 # 3. Ingest (Save Session ID in Metadata)
 def ingest_document(file_identifier, text_content):
     """Process and store document embeddings in the vector database.
@@ -104,6 +194,7 @@ def ingest_document(file_identifier, text_content):
         - 100 character overlap for context continuity
         - Batch embedding for API efficiency
         - Batch upsert for Pinecone size limits
+        - Batches embedded and upserted in parallel
 
     Args:
         file_identifier: Unique identifier in format 'SESSIONID_FILENAME'
@@ -134,103 +225,123 @@ def ingest_document(file_identifier, text_content):
         # Overlap of 100 chars maintains semantic continuity between chunks
         chunk_size = 800
         chunk_overlap = 100
-        chunks = []
-        for i in range(0, len(text_content), chunk_size - chunk_overlap):
-            chunk = text_content[i : i + chunk_size]
-            if chunk.strip():  # Only add non-empty chunks
-                chunks.append(chunk)
+        # Stop before the final overlap: a window starting there would only
+        # repeat text the previous chunk already covers, wasting an embedding
+        last_start = max(len(text_content) - chunk_overlap, min(len(text_content), 1))
+        chunks = [
+            chunk
+            for chunk in (
+                text_content[i : i + chunk_size]
+                for i in range(0, last_start, chunk_size - chunk_overlap)
+            )
+            if not chunk.isspace()  # Skip whitespace-only chunks without copying
+        ]
 
         if not chunks:
             raise ValueError("No text chunks to process")
 
-        # Use batch embedding API for efficiency (up to 100 texts per request)
-        vectors = []
-        batch_size_for_embedding = 10  # Embed 10 chunks at a time
-
-        for batch_start in range(0, len(chunks), batch_size_for_embedding):
-            batch_end = min(batch_start + batch_size_for_embedding, len(chunks))
-            batch_chunks = chunks[batch_start:batch_end]
-
+        # Use batch embedding API for efficiency (up to 100 texts per request),
+        # so a typical document is embedded in one or two round trips. Each
+        # batch is upserted as soon as it is embedded, and long documents
+        # process their batches in parallel. Upserts are split in halves:
+        # 100 vectors of 768 floats plus chunk text serialise to ~1.7-1.9MB,
+        # too close to Pinecone's 2MB request limit, while 50 take ~0.9MB.
+        batch_size = 100  # Embed 100 chunks at a time
+        upsert_batch_size = 50
+        max_parallel_batches = 4
+        batch_starts = range(0, len(chunks), batch_size)
+
+        def ingest_batch(batch_start):
+            batch_chunks = chunks[batch_start : batch_start + batch_size]
+            vectors = _embed_batch(
+                google_client, file_identifier, session_id, batch_start, batch_chunks
+            )
             try:
-                # Batch embed multiple chunks in one API call
-                response = google_client.models.embed_content(
-                    model="gemini-embedding-001",
-                    contents=batch_chunks,
-                    config={"output_dimensionality": 768},
-                )
-
-                # Process embeddings for this batch
-                for idx, chunk in enumerate(batch_chunks):
-                    chunk_idx = batch_start + idx
-                    embedding = response.embeddings[idx].values
-                    vector_id = f"{file_identifier}_{chunk_idx}"
-
-                    vectors.append(
-                        {
-                            "id": vector_id,
-                            "values": embedding,
-                            "metadata": {
-                                "text": chunk,
-                                "source": file_identifier,
-                                "session_id": session_id,
-                            },
-                        }
-                    )
-
-                logger.info(
-                    "Embedded batch %s: chunks %s-%s",
-                    batch_start // batch_size_for_embedding + 1,
-                    batch_start,
-                    batch_end - 1,
-                )
+                for i in range(0, len(vectors), upsert_batch_size):
+                    index.upsert(vectors=vectors[i : i + upsert_batch_size])
             except Exception as e:
                 logger.error(
-                    "Failed to embed batch starting at chunk %s: %s",
-                    batch_start,
-                    e,
+                    "Failed to upsert batch starting at chunk %s: %s", batch_start, e
                 )
                 raise
-
-        if not vectors:
+            logger.info(
+                "Upserted %s vectors from chunk %s for %s",
+                len(vectors),
+                batch_start,
+                file_identifier,
+            )
+            return len(vectors)
+
+        if len(batch_starts) == 1:
+            vector_count = ingest_batch(0)
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(max_parallel_batches, len(batch_starts))
+            ) as executor:
+                # Iterating map() re-raises the first failed batch
+                vector_count = sum(executor.map(ingest_batch, batch_starts))
+
+        if not vector_count:
             raise ValueError("No vectors were successfully created")
 
-        # Batch upsert to respect Pinecone's size limits (~4MB per request)
-        pinecone_batch_size = 50  # Upsert in batches of 50 vectors
-        for i in range(0, len(vectors), pinecone_batch_size):
-            batch = vectors[i : i + pinecone_batch_size]
-            try:
-                index.upsert(vectors=batch)
-                logger.info(
-                    "Upserted batch %s with %s vectors for %s",
-                    i // pinecone_batch_size + 1,
-                    len(batch),
-                    file_identifier,
-                )
-            except Exception as e:
-                logger.error(
-                    "Failed to upsert batch %s: %s",
-                    i // pinecone_batch_size + 1,
-                    e,
-                )
-                raise
-
         logger.info(
             "Successfully ingested %s vectors for %s",
-            len(vectors),
+            vector_count,
             file_identifier,
         )
-        return len(vectors)
+        invalidate_context_cache(session_id)
+        return vector_count
     except Exception as e:
         logger.error("Document ingestion failed for %s: %s", file_identifier, e)
         raise
 
 
+def _context_cache_keys(query, session_id):
+    """Build the cache keys for a query's context and its session's version.
+
+    Args:
+        query: The user's question or search query.
+        session_id: The session the search is limited to, or None.
+
+    Returns:
+        tuple: ``(context_key, version_key)``. Queries that differ only
+            in case or whitespace share a context key.
+    """
+    normalized = " ".join(query.lower().split())
+    digest = hashlib.sha256(f"{session_id}\n{normalized}".encode()).hexdigest()
+    return (
+        f"{CACHE_PREFIX_CONTEXT}{digest}",
+        f"{CACHE_PREFIX_CONTEXT_VERSION}{session_id}",
+    )
+
+
+def invalidate_context_cache(session_id):
+    """Forget the cached context for a session.
+
+    Called when the session's documents change. The version outlives
+    every entry stored before it, so it can simply expire afterwards.
+
+    Args:
+        session_id: The session whose documents changed.
+    """
+    try:
+        cache.set(
+            f"{CACHE_PREFIX_CONTEXT_VERSION}{session_id}",
+            time.time_ns(),
+            timeout=CONTEXT_CACHE_TIMEOUT,
+        )
+    except Exception as e:
+        logger.warning("Could not invalidate context for session %s: %s", session_id, e)
+
+
 # 4. Retrieve (Filter by Session ID)
 def retrieve_context(query, session_id=None):
     """Retrieve relevant document context for a user query.
 
     Embeds the query using Gemini, searches Pinecone for similar
-    vectors, and returns the matched text chunks as context.
+    vectors, and returns the matched text chunks as context. Results
+    are cached for CONTEXT_CACHE_TIMEOUT seconds, until the session's
+    documents change.
 
     Args:
         query: The user's question or search query.
@@ -241,6 +352,19 @@ def retrieve_context(query, session_id=None):
         str: Concatenated text from the top matching chunks, or an
             empty string if no matches found or retrieval fails.
     """
+    context_key, version_key = _context_cache_keys(query, session_id)
+    try:
+        cached = cache.get_many([context_key, version_key])
+    except Exception as e:
+        logger.warning("Could not read cached context: %s", e)
+        cached = {}
+    version = cached.get(version_key)
+    if context_key in cached:
+        cached_version, context_text = cached[context_key]
+        if cached_version == version:
+            logger.debug("Using cached context (session: %s)", session_id)
+            return context_text
+
     try:
         google_client, index = get_clients()
 
@@ -265,16 +389,21 @@ def retrieve_context(query, session_id=None):
             filter=filter_dict,  # <--- Apply the filter here
         )
 
-        context_text = ""
-        for match in search_results["matches"]:
-            context_text += match["metadata"]["text"] + "\n\n"
+        context_text = "".join(
+            match["metadata"]["text"] + "\n\n" for match in search_results["matches"]
+        )
 
         logger.info("Retrieved context for query (session: %s)", session_id)
-        return context_text
     except Exception as e:
         logger.error("Context retrieval failed: %s", e)
         return ""  # Return empty string instead of crashing
 
+    try:
+        cache.set(context_key, (version, context_text), timeout=CONTEXT_CACHE_TIMEOUT)
+    except Exception as e:
+        logger.warning("Could not cache context: %s", e)
+    return context_text
+
 
 # 5. Delete Vectors (The Cleaner) - Enhanced with retry logic
 def delete_session_vectors(session_id, max_retries=3):
@@ -293,8 +422,6 @@ def delete_session_vectors(session_id, max_retries=3):
         bool: True if deletion succeeded, False if all retries failed.
             Logs a critical error on complete failure for manual cleanup.
     """
-    import time
-
     for attempt in range(max_retries):
         try:
             _, index = get_clients()
@@ -351,13 +478,12 @@ def delete_document_vectors(file_identifier, max_retries=3):
         bool: True if deletion succeeded, False if all retries failed.
             Logs a critical error on complete failure.
     """
-    import time
-
     for attempt in range(max_retries):
         try:
             _, index = get_clients()
             # Delete all vectors where source matches the file_identifier
             index.delete(filter={"source": {"$eq": file_identifier}})
+            invalidate_context_cache(file_identifier.split("_")[0])
             logger.info(
                 "🧹 Successfully cleaned vectors for document %s (attempt %s)",
                 file_identifier,
@@ -16,12 +16,18 @@ The cleanup cascade:
     User deletion → Session cleanup (vectors) → Document cleanup (Cloudinary)
     Session deletion → Document cleanup (via CASCADE) → Vector cleanup
     Document deletion → Cloudinary file cleanup
+
+Vector cleanup runs in a background thread once the deletion has been
+committed, so its Pinecone calls and retry back-off don't hold the
+request or the delete transaction open.
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 import cloudinary.uploader
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.db.models.signals import post_delete, pre_delete
 from django.dispatch import receiver
 
@@ -32,6 +38,39 @@ User = get_user_model()
 
 logger = logging.getLogger(__name__)
 
+# Runs Pinecone vector deletes (and their retries) off the request thread
+_vector_cleanup_executor = ThreadPoolExecutor(
+    max_workers=2, thread_name_prefix="vector-cleanup"
+)
+
+
+def _schedule_vector_cleanup(session_id, description):
+    """Delete a session's vectors in the background after the commit.
+
+    Nothing is deleted if the transaction deleting the session rolls
+    back.
+
+    Args:
+        session_id: The ID of the session whose vectors to delete.
+        description: Who the session belonged to, for the log message
+            recorded if the vectors may be orphaned.
+    """
+
+    def cleanup():
+        if delete_session_vectors(session_id):
+            logger.info("✅ Vectors cleaned for session %s", session_id)
+            return
+        # Vector cleanup failed - create an orphaned vectors tracking log
+        # This allows admins to manually clean up later or implement a cleanup job
+        logger.critical(
+            "⚠️ SESSION DELETED BUT VECTORS MAY BE ORPHANED: %s. "
+            "RECOMMEND: Manual Pinecone cleanup with filter session_id=%s",
+            description,
+            session_id,
+        )
+
+    transaction.on_commit(lambda: _vector_cleanup_executor.submit(cleanup))
+
 
 # 0. Trigger when a USER is deleted - cleanup all user's PDFs from Cloudinary
 @receiver(pre_delete, sender=User)
@@ -39,7 +78,7 @@ def cleanup_user_data(sender, instance, **kwargs):
     """Clean up all user data before user deletion.
 
     This pre-delete signal handler runs before Django's CASCADE delete.
-    It cleans up Pinecone vectors for all user sessions. Cloudinary
+    It schedules Pinecone vector cleanup for all user sessions. Cloudinary
     file cleanup is handled automatically by Document post_delete signals
     when CASCADE deletes the documents.
 
@@ -74,10 +113,11 @@ def cleanup_user_data(sender, instance, **kwargs):
                     doc_count,
                 )
 
-            # Clean Pinecone vectors for this session
-            cleanup_success = delete_session_vectors(session.id)
-            if not cleanup_success:
-                logger.warning("⚠️ Vectors may be orphaned for session %s", session.id)
+            # Clean Pinecone vectors for this session once the deletion commits
+            _schedule_vector_cleanup(
+                session.id,
+                f"Session ID: {session.id}, User: {instance.username}",
+            )
 
     logger.info(
         "✅ User %s pre-delete cleanup completed (CASCADE will handle documents)",
@@ -90,10 +130,11 @@ def cleanup_user_data(sender, instance, **kwargs):
 def cleanup_session_data(sender, instance, **kwargs):
     """Clean up session data before session deletion.
 
-    Deletes Pinecone vectors associated with the session. Document
-    cleanup is handled by Django CASCADE triggering Document post_delete
-    signals. Logs warnings if vector cleanup fails but does not block
-    session deletion.
+    Schedules deletion of the Pinecone vectors associated with the
+    session once the deletion commits. Document cleanup is handled by
+    Django CASCADE triggering Document post_delete signals. Logs a
+    critical error if vector cleanup fails but does not block session
+    deletion.
 
     Args:
         sender: The model class (ChatSession).
@@ -113,31 +154,18 @@ def cleanup_session_data(sender, instance, **kwargs):
         # Documents will be deleted by CASCADE, triggering their post_delete signal
         # which handles Cloudinary cleanup - no need to manually delete here
 
-    # Clean Pinecone Vectors with retry logic
-    cleanup_success = delete_session_vectors(instance.id)
-
-    if not cleanup_success:
-        # Vector cleanup failed - create an orphaned vectors tracking log
-        # This allows admins to manually clean up later or implement a cleanup job
-        logger.critical(
-            "⚠️ SESSION DELETED BUT VECTORS MAY BE ORPHANED: "
-            "Session ID: %s, Title: '%s', User: %s. "
-            "RECOMMEND: Manual Pinecone cleanup with filter session_id=%s",
-            instance.id,
-            instance.title,
-            instance.user.username,
-            instance.id,
-        )
-        # Note: We don't raise an exception here to prevent blocking the session deletion
-        # The session will be deleted, but vectors may remain (orphaned)
-        # This is better than preventing deletion entirely
-
-    logger.info(
-        "✅ Session %s cleanup completed (vectors %s)",
+    # Clean Pinecone Vectors with retry logic once the deletion commits. A
+    # failure is logged but never blocks the session deletion: vectors may
+    # remain (orphaned), which is better than preventing deletion entirely.
+    # The user is identified by ID so the description needs no user query.
+    _schedule_vector_cleanup(
         instance.id,
-        "cleaned" if cleanup_success else "MAY BE ORPHANED",
+        f"Session ID: {instance.id}, Title: '{instance.title}', "
+        f"User ID: {instance.user_id}",
     )
 
+    logger.info("✅ Session %s cleanup scheduled", instance.id)
+
 
 # 2. Trigger when a DOCUMENT is deleted
 @receiver(post_delete, sender=Document)
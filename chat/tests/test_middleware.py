@@ -11,19 +11,60 @@ Middleware tests focus on:
     - Response handling
 """
 
-from django.test import TestCase, Client, RequestFactory
+from django.test import TestCase, Client, RequestFactory, override_settings
 from django.contrib.auth.models import User
 from django.http import HttpResponse
+from django.utils.functional import SimpleLazyObject
 from unittest.mock import patch, MagicMock
+import time
 from chat.middleware import (
     RateLimitMiddleware,
     APIRateLimitMiddleware,
     USER_REQUESTS_PER_MINUTE,
     USER_REQUESTS_PER_HOUR,
+    API_REQUESTS_PER_MINUTE,
     GLOBAL_PARALLEL_LIMIT,
+    CACHE_PREFIX_USER,
+    _count_user_limits,
+    _get_redis_client,
+    _global_slots_snapshot,
+    _recent_rejections,
 )
 
 
+def mock_user_counters(mock_cache, global_slots=None, **counts):
+    """Serve per-user counters and global slots from a mocked cache.
+
+    Args:
+        mock_cache: The patched chat.middleware.cache object.
+        global_slots: Optional global slot mapping. Defaults to no slots.
+        **counts: Request counts in the current window, keyed by limit
+            name ("minute", "hour" or "api").
+    """
+    now = int(time.time())
+    windows = {"minute": 60, "hour": 3600, "api": 60}
+    counters = {
+        name: (now // windows[name], count, 0) for name, count in counts.items()
+    }
+    serve_cache_entries(mock_cache, counters, global_slots or {})
+
+
+def serve_cache_entries(mock_cache, counters, global_slots):
+    """Answer get and get_many on a mocked cache with fixed entries.
+
+    Args:
+        mock_cache: The patched chat.middleware.cache object.
+        counters: The value stored under every per-user counter key.
+        global_slots: The value stored under the global slot key.
+    """
+
+    def lookup(key, default=None):
+        return counters if key.startswith(CACHE_PREFIX_USER) else global_slots
+
+    mock_cache.get.side_effect = lookup
+    mock_cache.get_many.side_effect = lambda keys: {key: lookup(key) for key in keys}
+
+
 class RateLimitMiddlewareTest(TestCase):
     """Test cases for the RateLimitMiddleware class."""
 
@@ -36,6 +77,9 @@ class RateLimitMiddlewareTest(TestCase):
         # Create a simple get_response callable
         self.get_response = lambda request: HttpResponse("OK")
         self.middleware = RateLimitMiddleware(self.get_response)
+        # Force a fresh global slot read in every test
+        _global_slots_snapshot.update(active=0, checked_at=float("-inf"))
+        _recent_rejections.clear()
 
     def test_middleware_passes_unauthenticated_requests(self):
         """Test that unauthenticated requests pass through."""
@@ -48,6 +92,20 @@ class RateLimitMiddlewareTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.content, b"OK")
 
+    def test_middleware_skips_anonymous_session_without_loading_user(self):
+        """Test that anonymous sessions pass through without touching user."""
+        user_loads = []
+        request = self.factory.post("/chat/")
+        request.session = {}
+        request.user = SimpleLazyObject(
+            lambda: user_loads.append(True) or self.user
+        )
+
+        response = self.middleware(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(user_loads, [])
+
     def test_middleware_skips_get_requests(self):
         """Test that GET requests are not rate limited."""
         request = self.factory.get("/chat/")
@@ -87,7 +145,11 @@ class RateLimitMiddlewareTest(TestCase):
     @patch("chat.middleware.cache")
     def test_middleware_checks_global_limit(self, mock_cache):
         """Test that middleware checks global parallel limit."""
-        mock_cache.get.return_value = GLOBAL_PARALLEL_LIMIT + 1
+        expires = time.time() + 60
+        mock_user_counters(
+            mock_cache,
+            global_slots={f"slot-{i}": expires for i in range(GLOBAL_PARALLEL_LIMIT)},
+        )
 
         request = self.factory.post("/chat/")
         request.user = self.user
@@ -97,13 +159,82 @@ class RateLimitMiddlewareTest(TestCase):
         self.assertEqual(response.status_code, 429)
         self.assertIn("capacity", response.content.decode())
 
+    @patch("chat.middleware.cache")
+    def test_global_limit_check_never_reads_cache(self, mock_cache):
+        """Test that the global pre-check is served from the snapshot only."""
+        self.assertTrue(self.middleware._check_global_limit())
+
+        _global_slots_snapshot.update(
+            active=GLOBAL_PARALLEL_LIMIT, checked_at=time.monotonic()
+        )
+        self.assertFalse(self.middleware._check_global_limit())
+
+        mock_cache.get.assert_not_called()
+        mock_cache.get_many.assert_not_called()
+
+    @patch("chat.middleware.cache")
+    def test_fresh_full_snapshot_rejects_without_cache_read(self, mock_cache):
+        """Test a worker that just saw the limit reached skips the cache."""
+        _global_slots_snapshot.update(
+            active=GLOBAL_PARALLEL_LIMIT, checked_at=time.monotonic()
+        )
+
+        request = self.factory.post("/chat/")
+        request.user = self.user
+
+        response = self.middleware(request)
+
+        self.assertEqual(response.status_code, 429)
+        mock_cache.get_many.assert_not_called()
+
+    @patch("chat.middleware.cache")
+    def test_middleware_ignores_expired_global_slots(self, mock_cache):
+        """Test that slots leaked past their TTL do not count as active."""
+        expired = time.time() - 1
+        mock_user_counters(
+            mock_cache,
+            global_slots={f"slot-{i}": expired for i in range(GLOBAL_PARALLEL_LIMIT)},
+        )
+
+        request = self.factory.post("/chat/")
+        request.user = self.user
+
+        response = self.middleware(request)
+
+        self.assertEqual(response.status_code, 200)
+
+    @patch("chat.middleware.cache")
+    def test_middleware_releases_global_slot(self, mock_cache):
+        """Test that the global slot is released after the response."""
+        stored = {}
+
+        def fake_set(key, value, timeout=None):
+            stored[key] = value
+
+        def fake_set_many(data, timeout=None):
+            stored.update(data)
+            return []
+
+        mock_cache.get.side_effect = lambda key: dict(stored.get(key, {}))
+        mock_cache.get_many.side_effect = lambda keys: {
+            key: dict(stored[key]) for key in keys if key in stored
+        }
+        mock_cache.set.side_effect = fake_set
+        mock_cache.set_many.side_effect = fake_set_many
+
+        request = self.factory.post("/chat/")
+        request.user = self.user
+
+        response = self.middleware(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(stored["rate_limit_global_active"], {})
+
     @patch("chat.middleware.cache")
     def test_middleware_checks_minute_limit(self, mock_cache):
         """Test that middleware checks per-minute limit."""
         # Global limit OK, but minute limit exceeded
-        mock_cache.get.side_effect = lambda key, default=0: (
-            0 if "global" in key else USER_REQUESTS_PER_MINUTE + 1
-        )
+        mock_user_counters(mock_cache, minute=USER_REQUESTS_PER_MINUTE)
 
         request = self.factory.post("/chat/")
         request.user = self.user
@@ -113,23 +244,144 @@ class RateLimitMiddlewareTest(TestCase):
         self.assertEqual(response.status_code, 429)
         self.assertIn("wait", response.content.decode().lower())
 
+    @patch("chat.middleware.cache")
+    def test_middleware_checks_hour_limit(self, mock_cache):
+        """Test that middleware checks per-hour limit."""
+        # Global and minute limits OK, but hour limit exceeded
+        mock_user_counters(mock_cache, hour=USER_REQUESTS_PER_HOUR)
+
+        request = self.factory.post("/chat/")
+        request.user = self.user
+
+        response = self.middleware(request)
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("hourly", response.content.decode().lower())
+
     @patch("chat.middleware.cache")
     def test_middleware_increments_counters(self, mock_cache):
         """Test that middleware increments rate limit counters."""
-        mock_cache.get.return_value = 0
+        mock_user_counters(mock_cache, minute=2, hour=7)
+
+        request = self.factory.post("/chat/")
+        request.user = self.user
+
+        response = self.middleware(request)
+
+        # Verify the counters and the slot were written in a single call
+        mock_cache.set_many.assert_called_once()
+        written = mock_cache.set_many.call_args.args[0]
+        self.assertEqual(len(written["rate_limit_global_active"]), 1)
+        counters = written[f"{CACHE_PREFIX_USER}{self.user.id}"]
+        self.assertEqual(counters["minute"][1:], (3, 0))
+        self.assertEqual(counters["hour"][1:], (8, 0))
+
+    @patch("chat.middleware.cache")
+    def test_middleware_reads_counters_and_slots_together(self, mock_cache):
+        """Test that user counters and global slots share one cache read."""
+        mock_user_counters(mock_cache)
+
+        request = self.factory.post("/chat/")
+        request.user = self.user
+
+        self.middleware(request)
+
+        mock_cache.get_many.assert_called_once_with(
+            [f"{CACHE_PREFIX_USER}{self.user.id}", "rate_limit_global_active"]
+        )
+
+    @patch("chat.middleware.cache")
+    def test_middleware_does_not_count_request_rejected_by_global_limit(
+        self, mock_cache
+    ):
+        """Test that a request refused a global slot is not counted."""
+        expires = time.time() + 60
+        mock_user_counters(
+            mock_cache,
+            global_slots={f"slot-{i}": expires for i in range(GLOBAL_PARALLEL_LIMIT)},
+        )
+        # Stale snapshot from this worker lets the pre-check through
+        _global_slots_snapshot.update(active=0, checked_at=time.monotonic())
+
+        request = self.factory.post("/chat/")
+        request.user = self.user
+
+        response = self.middleware(request)
+
+        self.assertEqual(response.status_code, 429)
+        mock_cache.set.assert_not_called()
+        mock_cache.set_many.assert_not_called()
+
+    @patch("chat.middleware.cache")
+    def test_middleware_fails_open_when_paired_write_fails(self, mock_cache):
+        """Test a failed counter and slot write allows the request."""
+        mock_user_counters(mock_cache)
+        mock_cache.set_many.side_effect = Exception("Cache unavailable")
+
+        request = self.factory.post("/chat/")
+        request.user = self.user
+
+        response = self.middleware(request)
+
+        self.assertEqual(response.status_code, 200)
+        mock_cache.set_many.assert_called_once()
+        # No slot was stored, so releasing it writes nothing back
+        mock_cache.set.assert_not_called()
+
+    @patch("chat.middleware.cache")
+    def test_middleware_resets_counters_from_elapsed_window(self, mock_cache):
+        """Test that a count from a fully elapsed window is not carried over."""
+        stale_window = int(time.time()) // 60 - 2
+        serve_cache_entries(
+            mock_cache, {"minute": (stale_window, USER_REQUESTS_PER_MINUTE, 0)}, {}
+        )
 
         request = self.factory.post("/chat/")
         request.user = self.user
 
         response = self.middleware(request)
 
-        # Verify cache.set was called to increment counters
-        self.assertTrue(mock_cache.set.called)
+        self.assertEqual(response.status_code, 200)
+
+    @patch("chat.middleware.cache")
+    def test_repeat_request_after_rejection_skips_cache(self, mock_cache):
+        """Test that a recently rejected user is rejected from memory."""
+        mock_user_counters(mock_cache, minute=USER_REQUESTS_PER_MINUTE)
+
+        for _ in range(2):
+            request = self.factory.post("/chat/")
+            request.user = self.user
+            response = self.middleware(request)
+            self.assertEqual(response.status_code, 429)
+
+        mock_cache.get_many.assert_called_once()
+
+    @override_settings(REDIS_URL=None)
+    def test_database_cache_fallback_without_redis_url(self):
+        """Test no Redis client is used when REDIS_URL is not set."""
+        self.assertIsNone(_get_redis_client())
+
+    def test_previous_window_count_is_weighted_by_overlap(self):
+        """Test that the previous window limits bursts at the boundary."""
+        limits = (("minute", 60, USER_REQUESTS_PER_MINUTE),)
+        # One request so far in window 10, a full window 9 before it
+        counters = {"minute": (10, 1, USER_REQUESTS_PER_MINUTE)}
+
+        # 6s into the next window, 90% of the previous window still counts
+        with patch("chat.middleware.time.time", return_value=606.0):
+            exceeded, _ = _count_user_limits(counters, limits)
+        self.assertEqual(exceeded, "minute")
+
+        # 54s in, only 10% of it counts and the request is allowed
+        with patch("chat.middleware.time.time", return_value=654.0):
+            exceeded, updated = _count_user_limits(counters, limits)
+        self.assertIsNone(exceeded)
+        self.assertEqual(updated["minute"], (10, 2, USER_REQUESTS_PER_MINUTE))
 
     @patch("chat.middleware.cache")
     def test_rate_limit_response_includes_retry_after(self, mock_cache):
         """Test that rate limit response includes Retry-After header."""
-        mock_cache.get.return_value = USER_REQUESTS_PER_MINUTE + 1
+        mock_user_counters(mock_cache, minute=USER_REQUESTS_PER_MINUTE)
 
         request = self.factory.post("/chat/")
         request.user = self.user
@@ -139,6 +391,111 @@ class RateLimitMiddlewareTest(TestCase):
         self.assertEqual(response.status_code, 429)
         self.assertIn("Retry-After", response.headers)
 
+    @patch("chat.middleware.cache")
+    def test_rate_limit_response_for_htmx_is_html(self, mock_cache):
+        """Test that HTMX requests receive an HTML system message."""
+        mock_user_counters(mock_cache, minute=USER_REQUESTS_PER_MINUTE)
+
+        request = self.factory.post("/chat/", HTTP_HX_REQUEST="true")
+        request.user = self.user
+
+        response = self.middleware(request)
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("text/html", response["Content-Type"])
+        self.assertIn("system-notification", response.content.decode())
+        self.assertEqual(response["Retry-After"], "10")
+
+
+class RedisRateLimitTest(TestCase):
+    """Test cases for the atomic Redis rate limit path."""
+
+    def setUp(self):
+        """Serve the rate limit alias from a mocked Redis client."""
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.middleware = RateLimitMiddleware(lambda request: HttpResponse("OK"))
+        _global_slots_snapshot.update(active=0, checked_at=float("-inf"))
+        _recent_rejections.clear()
+
+        self.client_mock = MagicMock()
+        self.script = self.client_mock.register_script.return_value
+        client_patcher = patch(
+            "chat.middleware._get_redis_client", return_value=self.client_mock
+        )
+        script_patcher = patch("chat.middleware._redis_consume_script", None)
+        cache_patcher = patch("chat.middleware.cache")
+        client_patcher.start()
+        script_patcher.start()
+        mock_cache = cache_patcher.start()
+        mock_cache.make_key.side_effect = lambda key: key
+        self.addCleanup(client_patcher.stop)
+        self.addCleanup(script_patcher.stop)
+        self.addCleanup(cache_patcher.stop)
+
+    def post(self):
+        """Send a chat POST through the middleware as the test user."""
+        request = self.factory.post("/chat/")
+        request.user = self.user
+        return self.middleware(request)
+
+    def test_allowed_request_reserves_and_releases_slot(self):
+        """Test one script call counts the request and reserves a slot."""
+        self.script.return_value = [0, 3]
+
+        response = self.post()
+
+        self.assertEqual(response.status_code, 200)
+        self.script.assert_called_once()
+        kwargs = self.script.call_args.kwargs
+        self.assertEqual(kwargs["keys"][0], "rate_limit_global_active")
+        # Two window keys per limit after the slot set
+        self.assertEqual(len(kwargs["keys"]), 5)
+        self.assertEqual(kwargs["args"][1], GLOBAL_PARALLEL_LIMIT)
+        slot_id = kwargs["args"][2]
+        self.client_mock.zrem.assert_called_once_with(
+            "rate_limit_global_active", slot_id
+        )
+        self.assertEqual(_global_slots_snapshot["active"], 3)
+
+    def test_exceeded_user_limit_is_named(self):
+        """Test the script's limit index maps back to the limit name."""
+        self.script.return_value = [2, 0]
+
+        response = self.post()
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("hourly", response.content.decode().lower())
+        self.client_mock.zrem.assert_not_called()
+
+    def test_global_limit_rejects_and_updates_snapshot(self):
+        """Test a full slot set rejects the request and is remembered."""
+        self.script.return_value = [-1, GLOBAL_PARALLEL_LIMIT]
+
+        response = self.post()
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("capacity", response.content.decode())
+        self.assertFalse(self.middleware._check_global_limit())
+
+    def test_api_limit_does_not_reserve_slot(self):
+        """Test the API limit is counted without touching the slot set."""
+        self.script.return_value = [1, 0]
+        middleware = APIRateLimitMiddleware(lambda request: HttpResponse("OK"))
+
+        self.assertFalse(middleware._check_api_rate_limit(self.user.id))
+        self.assertEqual(self.script.call_args.kwargs["args"][1], 0)
+
+    def test_script_error_fails_open(self):
+        """Test a Redis error allows the request."""
+        self.script.side_effect = Exception("Redis unavailable")
+
+        response = self.post()
+
+        self.assertEqual(response.status_code, 200)
+
 
 class APIRateLimitMiddlewareTest(TestCase):
     """Test cases for the APIRateLimitMiddleware class."""
@@ -151,6 +508,7 @@ class APIRateLimitMiddlewareTest(TestCase):
         )
         self.get_response = lambda request: HttpResponse("OK")
         self.middleware = APIRateLimitMiddleware(self.get_response)
+        _recent_rejections.clear()
 
     def test_middleware_skips_non_chat_paths(self):
         """Test that non-chat paths pass through."""
@@ -181,10 +539,22 @@ class APIRateLimitMiddlewareTest(TestCase):
 
         self.assertEqual(response.status_code, 200)
 
+    @patch("chat.middleware.cache")
+    def test_middleware_skips_anonymous_users(self, mock_cache):
+        """Test that anonymous users are not counted against a shared key."""
+        request = self.factory.post("/chat/", {"message": "test"})
+        request.user = MagicMock()
+        request.user.is_authenticated = False
+
+        response = self.middleware(request)
+
+        self.assertEqual(response.status_code, 200)
+        mock_cache.get.assert_not_called()
+
     @patch("chat.middleware.cache")
     def test_middleware_rate_limits_api_calls(self, mock_cache):
         """Test that middleware rate limits API calls."""
-        mock_cache.get.return_value = 6  # Over limit of 5
+        mock_user_counters(mock_cache, api=API_REQUESTS_PER_MINUTE)
 
         request = self.factory.post("/chat/", {"message": "test"})
         request.user = self.user
@@ -197,7 +567,7 @@ class APIRateLimitMiddlewareTest(TestCase):
     @patch("chat.middleware.cache")
     def test_middleware_allows_under_limit(self, mock_cache):
         """Test that requests under limit pass through."""
-        mock_cache.get.return_value = 3  # Under limit of 5
+        mock_user_counters(mock_cache, api=API_REQUESTS_PER_MINUTE - 2)
 
         request = self.factory.post("/chat/", {"message": "test"})
         request.user = self.user
@@ -215,6 +215,68 @@ class MessageModelTest(TestCase):
         self.assertIn("<li>", html)
         self.assertIn("Item 1", html)
 
+    def test_message_html_content_stored_on_save(self):
+        """Test assistant messages store their rendered HTML when saved."""
+        message = Message.objects.create(
+            session=self.session, role="assistant", content="**Saved**"
+        )
+        message.refresh_from_db()
+
+        self.assertIn("<strong>Saved</strong>", message.html_content)
+        with patch.object(Message, "render_html") as mock_render:
+            self.assertEqual(message.get_html_content(), message.html_content)
+        mock_render.assert_not_called()
+
+    def test_message_get_html_content_renders_missing_html_without_writing(self):
+        """Test messages without stored HTML are rendered but not saved."""
+        message = Message.objects.create(
+            session=self.session, role="assistant", content="**Old**"
+        )
+        Message.objects.filter(pk=message.pk).update(html_content="")
+        message.refresh_from_db()
+
+        with self.assertNumQueries(0):
+            html = message.get_html_content()
+
+        self.assertIn("<strong>Old</strong>", html)
+        message.refresh_from_db()
+        self.assertEqual(message.html_content, "")
+
+    def test_message_save_skips_render_when_content_not_saved(self):
+        """Test saves limited to other fields don't re-render the HTML."""
+        message = Message.objects.create(
+            session=self.session, role="assistant", content="**Saved**"
+        )
+        message.model_used = "gemini-2.5-flash"
+
+        with patch.object(Message, "render_html") as mock_render:
+            message.save(update_fields=["model_used"])
+            mock_render.assert_not_called()
+
+            message.content = "**Edited**"
+            mock_render.return_value = "<p>edited</p>"
+            message.save(update_fields=["content"])
+
+        message.refresh_from_db()
+        self.assertEqual(message.html_content, "<p>edited</p>")
+
+    def test_message_get_html_content_does_not_leak_between_messages(self):
+        """Test definitions in one message don't affect the next render."""
+        first = Message.objects.create(
+            session=self.session,
+            role="assistant",
+            content="HTML note[^1]\n\n*[HTML]: HyperText\n\n[^1]: Footnote",
+        )
+        second = Message.objects.create(
+            session=self.session, role="assistant", content="Plain HTML"
+        )
+
+        self.assertIn("<abbr", first.get_html_content())
+        html = second.get_html_content()
+
+        self.assertNotIn("<abbr", html)
+        self.assertNotIn("footnote", html)
+
     def test_message_role_choices(self):
         """Test that message role choices are valid."""
         valid_roles = ["user", "assistant"]
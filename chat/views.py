@@ -20,6 +20,7 @@ import os
 
 import cloudinary
 import cloudinary.uploader
+from django.conf import settings
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
@@ -166,8 +167,6 @@ def chat_view(request, session_id=None):
             # 2. Upload to Cloudinary using the SDK
             # Use environment-configured folder and unique public_id to prevent collisions
             # PDFs must be uploaded as 'raw' resource type for consistent deletion
-            from django.conf import settings
-
             folder_path = settings.CLOUDINARY_FOLDER
             unique_public_id = f"session_{current_session.id}_{uploaded_file.name}"
             upload_result = cloudinary.uploader.upload(
@@ -278,15 +277,15 @@ def chat_view(request, session_id=None):
 
         try:
             # Check if this is the first message (before creating it)
-            is_first_message = current_session.messages.count() == 0
+            is_first_message = not current_session.messages.exists()
 
             # --- RETRIEVE CONVERSATION HISTORY FOR CONTEXT ---
             # Get previous messages in this thread for context (limit to last 10 for token efficiency)
-            previous_messages = Message.objects.filter(
-                session=current_session
-            ).order_by("-created_at")[
-                :10
-            ]  # Last 10 messages, newest first
+            previous_messages = (
+                Message.objects.filter(session=current_session)
+                .defer("html_content")
+                .order_by("-created_at")[:10]
+            )  # Last 10 messages, newest first
 
             # Reverse to get chronological order (oldest to newest)
             previous_messages = list(reversed(previous_messages))
@@ -445,12 +444,9 @@ INSTRUCTIONS:
                 {"content": error_message, "error": True},
             )
 
-    # 5. Load History - Optimized query
-    messages = (
-        Message.objects.filter(session=current_session)
-        .select_related("session")
-        .order_by("created_at")
-    )
+    # 5. Load History - the template never reads msg.session, so don't
+    # join the session row onto every message
+    messages = Message.objects.filter(session=current_session).order_by("created_at")
 
     return render(
         request,
@@ -487,7 +483,7 @@ def new_chat(request):
     )
 
     # If the last session has NO messages, just redirect to it (Don't create a new one)
-    if last_session and last_session.messages.count() == 0:
+    if last_session and not last_session.messages.exists():
         return redirect("chat_session", session_id=last_session.id)
 
     # Otherwise, create a fresh one
@@ -516,8 +512,7 @@ def rename_chat(request, session_id):
         session = get_object_or_404(ChatSession, id=session_id, user=request.user)
 
         # Prevent renaming empty conversations (defensive check)
-        message_count = session.messages.count()
-        if message_count == 0:
+        if not session.messages.exists():
             return HttpResponse(status=204)  # No content, just ignore the request
 
         new_title = request.POST.get("new_title")
@@ -633,8 +628,7 @@ def delete_user_chat_session(request, session_id):
         session = get_object_or_404(ChatSession, id=session_id, user=request.user)
 
         # Prevent deletion of empty conversations (defensive check)
-        message_count = session.messages.count()
-        if message_count == 0:
+        if not session.messages.exists():
             return HttpResponse(status=204)  # No content, just ignore the request
 
         session.delete()
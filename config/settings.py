@@ -282,3 +282,16 @@ CACHES = {
         },
     }
 }
+
+# Rate limit counters are checked on every POST, so they move to Redis when
+# REDIS_URL is set. Without it they share the default DatabaseCache, which
+# still works across workers.
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    CACHES["rate_limit"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+        "KEY_PREFIX": "nexus",
+    }
+else:
+    CACHES["rate_limit"] = CACHES["default"]
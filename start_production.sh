@@ -48,14 +48,14 @@ check_redis() {
             print_message "✓ Redis is running"
         else
             print_warning "Redis connection failed!"
-            echo "  Falling back to local memory cache (single worker mode)"
+            echo "  Rate limiting will fail open until Redis is reachable"
             echo "  For production with multiple workers, ensure Redis is running:"
             echo "    sudo systemctl start redis"
         fi
     else
         print_warning "REDIS_URL not set in .env"
-        echo "  Using local memory cache (development mode)"
-        echo "  For production, install Redis and set REDIS_URL"
+        echo "  Rate limiting uses the database cache"
+        echo "  For faster rate limit checks, install Redis and set REDIS_URL"
     fi
 }
 